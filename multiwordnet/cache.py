@@ -0,0 +1,110 @@
+"""
+Identity maps for the Synsets and Lemmas of each WordNet within the MultiWordNet: one per language, shared by
+every WordNet of that language in the process.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Stands for "not in the map"; a lookup that found nothing in the databases is remembered as None
+MISSING = object()
+
+MAXSIZE = 65536
+
+_maps = {}
+_lock = threading.Lock()
+
+
+class IdentityMap(object):
+    """
+    Maps the key of a Synset or Lemma to the one instance built for it, so that constructing the same
+    synset or lemma again returns that instance instead of querying the databases to verify it.
+
+    maxsize: The number of instances kept; the least recently used are evicted first (None for no bound).
+    hits: The number of lookups answered from the map.
+    misses: The number of lookups that had to go to the databases.
+    """
+
+    def __init__(self, maxsize: int = MAXSIZE):
+        self._maxsize = maxsize
+        self._instances = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __len__(self):
+        return len(self._instances)
+
+    def __contains__(self, key):
+        return key in self._instances
+
+    def get(self, key):
+        """Returns the instance stored for key (possibly None), or MISSING."""
+        with self._lock:
+            instance = self._instances.get(key, MISSING)
+            if instance is MISSING:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._instances.move_to_end(key)
+            return instance
+
+    def put(self, key, instance):
+        """Stores the instance built for key, evicting the least recently used ones beyond maxsize."""
+        with self._lock:
+            self._instances[key] = instance
+            self._instances.move_to_end(key)
+            if self._maxsize is not None:
+                while len(self._instances) > self._maxsize:
+                    self._instances.popitem(last=False)
+        return instance
+
+    def resize(self, maxsize: int):
+        """Changes maxsize, evicting the least recently used instances beyond it."""
+        with self._lock:
+            self._maxsize = maxsize
+            if maxsize is not None:
+                while len(self._instances) > maxsize:
+                    self._instances.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._instances.clear()
+            self._hits = self._misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._instances))
+
+    def __repr__(self):
+        return f"IdentityMap(hits={self._hits}, misses={self._misses}, maxsize={self._maxsize}, currsize={len(self)})"
+
+
+def get(language: str, name: str = 'instances') -> IdentityMap:
+    """Returns a map of a language, creating it on first use: by default the identity map of its Synsets and
+    Lemmas, or another bounded map kept apart from it under a name (e.g. 'semfield_vectors')."""
+    identity_map = _maps.get((language, name))
+    if identity_map is None:
+        with _lock:
+            identity_map = _maps.setdefault((language, name), IdentityMap())
+    return identity_map
+
+
+def clear(language: str = None):
+    """Empties the maps of a language (by default every map), e.g. after recompiling."""
+    for (map_language, name), identity_map in list(_maps.items()):
+        if language is None or map_language == language:
+            identity_map.clear()
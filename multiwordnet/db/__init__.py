@@ -1,13 +1,18 @@
 """ Contains the WordNet databases  """
 
-import codecs
 import os
+import re
 import sqlite3
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from sqlite3 import IntegrityError, OperationalError
+from urllib.request import pathname2url
 
 from tqdm import tqdm
 
+from multiwordnet.db.derived import DERIVED, OPTIONAL, PREREQUISITES
+
 module = sys.modules['multiwordnet.db'].__path__[0]
 
 
@@ -35,48 +40,352 @@ def exists(language: str = None, database: str = None):
         ])
 
 
+# One read-only connection per (language, database) for each thread; a connection is only ever used
+# by the thread that opened it, so the registry is thread-local. Bumping the generation makes every
+# thread drop its connections the next time it asks for one.
+_registry = threading.local()
+_generation = 0
+
+
+def _connections() -> dict:
+    if getattr(_registry, 'generation', None) != _generation:
+        close()
+        _registry.connections = {}
+        _registry.generation = _generation
+    return _registry.connections
+
+
+def connection(language, database):
+    """ Returns the pooled, read-only connection to a database, or None if it has not been compiled """
+
+    connections = _connections()
+    key = (language, database)
+    if key not in connections:
+        path = f"{module}/{language}/{language}_{database}.db"
+        if os.path.exists(path):
+            try:
+                connections[key] = sqlite3.connect(f"file:{pathname2url(path)}?mode=ro", uri=True)
+            except OperationalError:
+                return None
+        else:
+            return None
+    return connections[key]
+
+
 def connect(language, database):
     """ Connects to a database """
 
     try:
-        if os.path.exists(f"{module}/{language}/{language}_{database}.db"):
-            cursor = sqlite3.connect(f"{module}/{language}/{language}_{database}.db").cursor()
-        else:
-            raise OperationalError
+        _connection = connection(language, database)
+        cursor = _connection.cursor() if _connection else None
     except OperationalError:
         cursor = None
     finally:
         return cursor
 
 
-def compile(language, *tables, overwrite=True, ignore_errors=True, verbose=True):
+def close(language=None, database=None):
+    """ Closes the current thread's pooled connections, optionally only those matching language and/or database """
+
+    connections = getattr(_registry, 'connections', {})
+    for key in list(connections):
+        if language in (None, key[0]) and database in (None, key[1]):
+            connections.pop(key).close()
+
+
+def reset():
+    """ Closes the current thread's pooled connections and makes every other thread reopen its own """
+
+    global _generation
+    close()
+    _generation += 1
+
+
+_INSERT = re.compile(r'[Ii][Nn][Ss][Ee][Rr][Tt]\s+[Ii][Nn][Tt][Oo]\s+([`"]?\w+[`"]?)\s+[Vv][Aa][Ll][Uu][Ee][Ss]\s*')
+_BATCH_SIZE = 500
+
+
+def _load(path: str, db: sqlite3.Connection, ignore_errors=True, verbose=True, desc=None):
+    """Streams a .sql dump into an open database.
+
+    The rows of consecutive 'INSERT INTO table VALUES ...' lines are joined into one multi-row INSERT, handed to
+    SQLite as text, in batches and inside a single transaction; any other statement is run as it stands, and the
+    dump's CREATE INDEX statements are deferred until the rows are loaded.
+    """
+    indexes = []
+    insert = f"INSERT {'OR IGNORE ' if ignore_errors is True else ''}INTO"
+    table = None
+    batch = []
+
+    def flush():
+        if batch:
+            try:
+                db.execute(f"{insert} {table} VALUES {', '.join(batch)}")
+            except (OperationalError, sqlite3.Warning, sqlite3.ProgrammingError):
+                # rows of different widths, or a line holding more than one statement: run the lines one by one
+                for values in batch:
+                    execute(f"{insert} {table} VALUES {values}")
+            batch.clear()
+
+    def execute(sql):
+        try:
+            db.execute(sql)
+        except (sqlite3.Warning, sqlite3.ProgrammingError):
+            db.execute("COMMIT")
+            try:
+                db.executescript(sql)
+            except IntegrityError:
+                if ignore_errors is not True:
+                    raise
+            db.execute("BEGIN")
+
+    with open(path, 'rb') as f, \
+            tqdm(total=os.path.getsize(path), unit='B', unit_scale=True, ncols=80, desc=desc, disable=not verbose) as progress:
+        db.execute("BEGIN")
+        read = 0
+        for line in f:
+            read += len(line)
+            sql = line.decode('utf-8').strip()
+            if not sql or sql.startswith('#'):
+                continue
+            match = _INSERT.match(sql)
+            if match:
+                if match.group(1) != table:
+                    flush()
+                    table = match.group(1)
+                batch.append(sql[match.end():].rstrip(';').rstrip())
+                if len(batch) >= _BATCH_SIZE:
+                    flush()
+                    progress.update(read)
+                    read = 0
+            elif re.match(r'CREATE\s+(UNIQUE\s+)?INDEX', sql, re.IGNORECASE):
+                indexes.append(sql)
+            else:
+                flush()
+                db.execute("COMMIT")
+                try:
+                    db.executescript(sql)
+                except IntegrityError:
+                    if ignore_errors is not True:
+                        raise
+                db.execute("BEGIN")
+        flush()
+        db.execute("COMMIT")
+        progress.update(read)
+
+    for index in indexes:
+        db.executescript(index)
+
+
+# Secondary indexes for the lookups in multiwordnet.wordnet, by table (the part of the file name after the
+# language). Each is created on the table of the dump, unless an index on the same leading columns already exists;
+# the tables derived from it declare their own indexes (see derived._replace()).
+INDEXES = {
+    'relation': [('id_source', 'type'), ('id_target', 'type'), ('w_source', 'type'), ('w_target', 'type')],
+    'synonyms': [('syn', 'pos'), ('lemma', 'pos')],
+    'semfield': [('synset',)],
+    'semfield_hierarchy': [('english',)],
+    'lemma': [('lemma', 'pos')],
+    'morpho': [('lemma', 'pos')],
+}
+
+
+def _names(db: sqlite3.Connection) -> list:
+    return [row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+
+
+def _index_name(name: str, index: tuple) -> str:
+    return f"{name}_{'_and_'.join(index)}_index"
+
+
+def _dumped(db: sqlite3.Connection, language: str, table: str) -> str:
+    """ The name of the table a dump creates: {language}_{table}, or table for the dumps that do not prefix it
+    (semfield_hierarchy), or None if the database has neither """
+
+    names = _names(db)
+    return next((name for name in (f"{language}_{table}", table) if name in names), None)
+
+
+def _index(db: sqlite3.Connection, language: str, table: str):
+    """ Creates the curated indexes on the table of a compiled dump and refreshes the query planner's statistics """
+
+    name = _dumped(db, language, table)
+    if name is not None:
+        columns = {row[1] for row in db.execute(f'PRAGMA table_info("{name}")')}
+        existing = [
+            tuple(row[2] for row in db.execute(f'PRAGMA index_info("{index[1]}")'))
+            for index in db.execute(f'PRAGMA index_list("{name}")')
+        ]
+        for index in INDEXES.get(table, []):
+            if not columns.issuperset(index) or any(other[:len(index)] == index for other in existing):
+                continue
+            db.execute(f'CREATE INDEX "{_index_name(name, index)}" ON "{name}" ({", ".join(index)})')
+            existing.append(index)
+    db.execute("ANALYZE")
+
+
+def _derive(db: sqlite3.Connection, language: str, table: str, closure=False):
+    for builder in DERIVED.get(table, []) + (OPTIONAL.get(table, []) if closure else []):
+        builder(db, language)
+
+
+def _forget(language: str):
+    """ Drops what the process holds in memory from a language's databases (every language's, for common and
+    english, which the others read): identity maps, relation graphs and the semfield hierarchy """
+    from multiwordnet import cache, graph, hierarchy  # they read through this module
+
+    if language in ('common', 'english'):
+        cache.clear()
+        graph.unload()
+        hierarchy.unload()
+    else:
+        cache.clear(language)
+        graph.unload(language)
+
+
+def reindex(language, *tables, closure=False, verbose=True):
+    """Rebuilds the curated indexes and derived tables of already compiled tables, without recompiling them from
+    their dumps.
+
+    :param language: The language whose tables to reindex.
+    :param tables: The tables to reindex; by default every compiled table of the language.
+    :param closure: Whether to also build the optional transitive closure of the relations ({language}_closure).
+    """
+    if not tables:
+        tables = [table for table in _tables(language) if exists(language, table)]
+
+    reset()
+    for table in tqdm(tables, ncols=80, desc=f"indexing {language}", disable=not verbose):
+        db = sqlite3.connect(f"{module}/{language}/{language}_{table}.db", isolation_level=None)
+        try:
+            name = _dumped(db, language, table)
+            for index in INDEXES.get(table, []) if name is not None else []:
+                db.execute(f'DROP INDEX IF EXISTS "{_index_name(name, index)}"')
+            _derive(db, language, table, closure=closure)
+            _index(db, language, table)
+        finally:
+            db.close()
+    reset()
+    _forget(language)
+
+
+class CompileError(Exception):
+    """ Raised when one or more tables fail to compile; errors maps each failed (language, table) to its exception """
+
+    def __init__(self, errors: dict):
+        self.errors = errors
+        super().__init__("failed to compile " + ", ".join(
+            f"{language}_{table} ({error.__class__.__name__}: {error})" for (language, table), error in errors.items()
+        ))
+
+
+def _tables(language: str) -> list:
+    """ Returns the names of the tables that can be compiled for a language """
+
+    return [filename.split('_', maxsplit=1)[1].replace('.sql', '') for filename in os.listdir(f"{module}/{language}/") if filename.endswith('.sql')]
+
+
+def compile(language, *tables, overwrite=True, ignore_errors=True, closure=False, verbose=True):
     if not tables:
-        tables = [filename.split('_', maxsplit=1)[1].replace('.sql', '') for filename in os.listdir(f"{module}/{language}/") if filename.endswith('.sql')]
+        tables = _tables(language)
 
     for table in tables:
-        if not os.path.exists(f"{module}/{language}/{language}_{table}.db") \
-                or overwrite is True:
-            f = codecs.open(f"{module}/{language}/{language}_{table}.sql", encoding='utf-8')
-            if not f:
-                continue
+        path = f"{module}/{language}/{language}_{table}"
+        if not os.path.exists(f"{path}.db") or overwrite is True:
+            if not os.path.exists(f"{path}.sql"):
+                raise FileNotFoundError(f"no such dump: '{path}.sql'")
+            reset()
             try:
-                os.remove(f"{module}/{language}/{language}_{table}.db")
+                os.remove(f"{path}.db")
             except OSError:
                 pass
-            db = sqlite3.connect(f"{module}/{language}/{language}_{table}.db").cursor()
-
-            if not db:
-                continue
-
+            db = sqlite3.connect(f"{path}.db", isolation_level=None)
             db.execute("PRAGMA synchronous = OFF")
             db.execute("PRAGMA journal_mode = MEMORY")
-            for sql in tqdm(f.readlines(), ncols=80, desc=f"{language}_{table}.sql", disable=not verbose):
-                if not(sql.startswith('#') or sql == '\n'):
-                    try:
-                        db.executescript(sql)
-                    except IntegrityError:
-                        if ignore_errors is True:
+            try:
+                _load(f"{path}.sql", db, ignore_errors=ignore_errors, verbose=verbose, desc=f"{language}_{table}.sql")
+                _derive(db, language, table, closure=closure)
+                _index(db, language, table)
+            except BaseException:
+                db.close()
+                os.remove(f"{path}.db")
+                raise
+            finally:
+                db.close()
+                reset()
+                _forget(language)
+
+
+def _compile_table(language, table, overwrite, ignore_errors, closure=False):
+    compile(language, table, overwrite=overwrite, ignore_errors=ignore_errors, closure=closure, verbose=False)
+    return language, table
+
+
+def compile_all(languages=None, workers=None, overwrite=True, ignore_errors=True, closure=False, verbose=True):
+    """Compiles every table of the given languages, building the tables in parallel in a process pool.
+
+    :param languages: The languages to compile; by default every language with a .sql dump. The common tables
+        other tables are derived from (derived.PREREQUISITES) are compiled first, and added if not compiled yet.
+    :param workers: The number of worker processes; by default the number of CPUs. 1 compiles in this process.
+    :param closure: Whether to also build the optional transitive closure of the relations ({language}_closure).
+    :raises CompileError: If any table fails; tables that had not started yet are not compiled.
+    """
+    if languages is None:
+        languages = sorted(name for name in os.listdir(module) if os.path.isdir(f"{module}/{name}") and _tables(name))
+    # the tables other tables derive from go first; then the largest dumps, so that no worker is left with a big
+    # table at the end
+    jobs = [(language, table) for language in languages for table in _tables(language)]
+    # a prerequisite of the tables asked for is compiled too, if it is not already (and there is a dump of it)
+    jobs += list(dict.fromkeys(
+        PREREQUISITES[table] for language, table in jobs
+        if table in PREREQUISITES and PREREQUISITES[table] not in jobs and not exists(*PREREQUISITES[table])
+        and os.path.exists(f"{module}/{PREREQUISITES[table][0]}/{'_'.join(PREREQUISITES[table])}.sql")
+    ))
+    jobs.sort(key=lambda job: os.path.getsize(f"{module}/{job[0]}/{job[0]}_{job[1]}.sql"), reverse=True)
+    prerequisites = set(PREREQUISITES.values())
+    waves = [[job for job in jobs if job in prerequisites], [job for job in jobs if job not in prerequisites]]
+    errors = {}
+
+    with tqdm(total=len(jobs), ncols=80, desc="compiling", unit="table", disable=not verbose) as progress:
+        def report(language, table, error=None):
+            if error is not None:
+                errors[(language, table)] = error
+                progress.write(f"{language}_{table}: failed ({error.__class__.__name__}: {error})")
+            elif verbose:
+                progress.write(f"{language}_{table}: done")
+            progress.update()
+
+        if workers == 1:
+            for language, table in waves[0] + waves[1]:
+                try:
+                    _compile_table(language, table, overwrite, ignore_errors, closure)
+                except Exception as error:
+                    report(language, table, error)
+                    break
+                else:
+                    report(language, table)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for wave in waves:
+                    if errors:
+                        break
+                    futures = {
+                        executor.submit(_compile_table, language, table, overwrite, ignore_errors, closure): (language, table)
+                        for language, table in wave
+                    }
+                    for future in as_completed(futures):
+                        if future.cancelled():
                             continue
+                        try:
+                            future.result()
+                        except Exception as error:
+                            report(*futures[future], error=error)
+                            for pending in futures:
+                                pending.cancel()
                         else:
-                            raise
-            f.close()
+                            report(*futures[future])
+    reset()
+    for language in dict.fromkeys(language for language, table in jobs):
+        _forget(language)
+    if errors:
+        raise CompileError(errors)
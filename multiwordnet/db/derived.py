@@ -0,0 +1,291 @@
+""" Tables derived from the dumps when a database is compiled
+
+Each builder takes the open, writable connection to a freshly loaded {language}_{table}.db and the language,
+and (re)creates its tables inside that same database, so that they are reachable through connect(language, table).
+"""
+
+import logging
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+from multiwordnet.inflection import inflect
+from multiwordnet.tags import MorphoTag, decode
+
+logger = logging.getLogger(__name__)
+
+_POS_COLUMNS = (('n', 'id_n'), ('v', 'id_v'), ('a', 'id_a'), ('r', 'id_r'))
+
+
+def _replace(db: sqlite3.Connection, name: str, schema: str, rows, indexes=(), using: str = None):
+    """ (Re)creates a table (a virtual table of the given module, if using), loads its rows in a single
+    transaction, then creates its indexes """
+
+    db.execute(f"DROP TABLE IF EXISTS {name}")
+    if using:
+        db.execute(f"CREATE VIRTUAL TABLE {name} USING {using}({schema})")
+    else:
+        db.execute(f"CREATE TABLE {name} ({schema})")
+    width = len(db.execute(f"PRAGMA table_info({name})").fetchall())
+    db.execute("BEGIN")
+    try:
+        db.executemany(f"INSERT OR IGNORE INTO {name} VALUES ({', '.join('?' * width)})", rows)
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    else:
+        db.execute("COMMIT")
+    for columns in indexes:
+        quoted = ', '.join(f'"{column}"' for column in columns)
+        db.execute(f"CREATE INDEX {name}_{'_and_'.join(columns)}_index ON {name} ({quoted})")
+
+
+def membership(db: sqlite3.Connection, language: str):
+    """Builds {language}_membership from {language}_index.
+
+    One (lemma, pos, synset, rank) row for every synset listed in a lemma's id_n, id_v, id_a or id_r column,
+    where rank is the synset's position in that list, so that a synset's lemmas are an index probe rather
+    than a LIKE scan over the space-separated lists.
+    """
+    def rows():
+        for lemma, *ids in db.execute(f"SELECT lemma, {', '.join(column for pos, column in _POS_COLUMNS)} FROM {language}_index").fetchall():
+            for (pos, column), synsets in zip(_POS_COLUMNS, ids):
+                if synsets:
+                    for rank, synset in enumerate(synsets.split()):
+                        yield lemma, pos, synset, rank
+
+    _replace(
+        db, f"{language}_membership",
+        "lemma TEXT NOT NULL, pos TEXT NOT NULL, synset TEXT NOT NULL, rank INTEGER NOT NULL, PRIMARY KEY (lemma, pos, synset)",
+        rows(), indexes=[('synset',)]
+    )
+
+
+def features(db: sqlite3.Connection, language: str):
+    """Builds {language}_features from {language}_morpho.
+
+    One row per morpho row (same id) holding its lemma, its pos and the features of its miscellanea tag decoded
+    into columns, as Morpho reports them: person only for verbs, degree only for adjectives and adverbs, and ''
+    for features the tag does not give.
+    """
+    names = [feature for feature in MorphoTag.__slots__ if feature != 'pos']
+
+    def rows():
+        for id, lemma, pos, miscellanea in db.execute(f"SELECT id, lemma, pos, miscellanea FROM {language}_morpho").fetchall():
+            tag = decode(miscellanea)
+            values = {name: getattr(tag, name) for name in names}
+            if pos != 'v':
+                values['person'] = None
+            if pos not in ('a', 'r'):
+                values['degree'] = None
+            yield (id, lemma, pos, *values.values())
+
+    _replace(
+        db, f"{language}_features",
+        "id INTEGER PRIMARY KEY, lemma TEXT NOT NULL, pos TEXT NOT NULL, " + ', '.join(f'"{name}" TEXT' for name in names),
+        rows(), indexes=[('pos', 'group'), ('pos', 'gender'), ('pos', 'voice')]
+    )
+
+
+def forms(db: sqlite3.Connection, language: str):
+    """Builds {language}_forms from {language}_morpho.
+
+    One (form, id, tag) row for every inflected form generated from a morpho row's principal parts, irregular and
+    alternative forms (see multiwordnet.inflection), keyed on the form so that analysing a word is a single probe.
+    Forms are only generated for Latin; the table is empty for the other languages.
+    """
+    def parse(value):
+        return [tuple(form.split('=')) for form in value.strip().split(' ')] if value else []
+
+    def rows():
+        if language != 'latin':
+            return
+        for id, lemma, pos, principal_parts, irregular_forms, alternative_forms, miscellanea in db.execute(
+                f"SELECT id, lemma, pos, principal_parts, irregular_forms, alternative_forms, miscellanea FROM {language}_morpho").fetchall():
+            principal_parts = principal_parts.strip().split(' ') if principal_parts else []
+            for form, tag in inflect(lemma, pos, principal_parts, parse(irregular_forms), parse(alternative_forms), miscellanea):
+                yield form, id, tag
+
+    _replace(
+        db, f"{language}_forms",
+        "form TEXT NOT NULL COLLATE NOCASE, id INTEGER NOT NULL, tag TEXT NOT NULL, PRIMARY KEY (form, id, tag)",
+        rows()
+    )
+
+
+def glosses(db: sqlite3.Connection, language: str):
+    """Builds {language}_gloss from {language}_synset.
+
+    An FTS5 full-text index of the synsets' glosses (id and pos stored alongside, unindexed), tokenised without
+    regard to case or diacritics, so that WordNet.search_glosses() ranks matching synsets with one MATCH query.
+    """
+    _replace(
+        db, f"{language}_gloss",
+        "id UNINDEXED, pos UNINDEXED, gloss, tokenize='unicode61 remove_diacritics 2'",
+        db.execute(f"SELECT id, substr(id, 1, 1), gloss FROM {language}_synset WHERE gloss IS NOT NULL AND trim(gloss) != ''").fetchall(),
+        using='fts5'
+    )
+
+
+def hierarchy(db: sqlite3.Connection, language: str):
+    """Builds {language}_ancestry and {language}_depth from {language}_relation (and, for a language, the compiled
+    common relations), both from one RelationGraph of the hypernymy (@) hierarchy.
+
+    {language}_ancestry holds one ancestor label per synset, as given by RelationGraph.ancestry(): its rank
+    (deepest synsets first), its max depth and the ranks of all its hypernyms, so that the lowest common
+    hypernyms of two synsets are a merge of two labels read by two index probes rather than a walk of the graph.
+    {language}_depth holds the min and max depth of every synset, computed for all of them at once by
+    RelationGraph.min_depths() and max_depths(), with an index on (pos, max_depth) so that the deepest synset
+    of a part of speech is a single probe.
+    """
+    relation_graph = _relation_graph(db, language, ('@',))
+    _replace(
+        db, f"{language}_ancestry",
+        "synset TEXT PRIMARY KEY, rank INTEGER NOT NULL UNIQUE, depth INTEGER NOT NULL, ancestors BLOB NOT NULL",
+        relation_graph.ancestry('@')
+    )
+    min_depths, max_depths = relation_graph.min_depths('@'), relation_graph.max_depths('@')
+    _replace(
+        db, f"{language}_depth",
+        "synset TEXT PRIMARY KEY, pos TEXT NOT NULL, min_depth INTEGER NOT NULL, max_depth INTEGER NOT NULL",
+        ((id, id[0], min_depths[node], max_depths[node]) for node, id in enumerate(relation_graph.ids)),
+        indexes=[('pos', 'max_depth')]
+    )
+
+
+def closure(db: sqlite3.Connection, language: str):
+    """Builds {language}_closure from {language}_relation (and, for a language, the compiled common relations).
+
+    Optional (compile(..., closure=True)): one (source, target, type, distance) row for every synset reachable
+    from another under each transitive relation type (graph.TRANSITIVE), indexed from both ends, so that all the
+    ancestors or descendants of a synset are a single index range scan.
+    """
+    from multiwordnet.graph import TRANSITIVE
+
+    _replace(
+        db, f"{language}_closure",
+        "source TEXT NOT NULL, target TEXT NOT NULL, type TEXT NOT NULL, distance INTEGER NOT NULL",
+        _relation_graph(db, language, TRANSITIVE, warn=False).closures(TRANSITIVE),  # hierarchy() has warned
+        indexes=[('source', 'type', 'distance'), ('target', 'type', 'distance')]
+    )
+
+
+def _relation_graph(db: sqlite3.Connection, language: str, types, warn=True):
+    """ The RelationGraph of the relations of the given types in {language}_relation and, unless language is
+    'common', in the compiled common_relation (with a warning, unless not warn, if it is not compiled) """
+    from multiwordnet.graph import RelationGraph  # the graph reads through multiwordnet.db, which imports this module
+
+    condition = f"type IN ({', '.join('?' * len(types))})"
+    rows = db.execute(f"SELECT type, id_source, id_target FROM {language}_relation WHERE {condition}", types).fetchall()
+    common = f"{os.path.dirname(__file__)}/common/common_relation.db"
+    if language != 'common' and os.path.exists(common):
+        common_relation = sqlite3.connect(f"file:{pathname2url(common)}?mode=ro", uri=True)
+        try:
+            rows += common_relation.execute(f"SELECT type, id_source, id_target FROM common_relation WHERE {condition}", types).fetchall()
+        finally:
+            common_relation.close()
+    elif language != 'common' and warn:
+        logger.warning("common_relation is not compiled: the hierarchy tables of %s_relation only cover its own "
+                       "relations; compile('common', 'relation') and reindex('%s', 'relation') to include it",
+                       language, language)
+    return RelationGraph(language, rows)
+
+
+def semfield_codes(db: sqlite3.Connection, language: str):
+    """Builds {language}_semfield_code from the semfield table of the database.
+
+    One (synset, code, english, rank) row for every semfield named in a synset's space-separated english column,
+    resolved against the compiled common_semfield_hierarchy (which must exist), where rank is the
+    name's position in that column, so that the synsets of a semfield and the semfields of a synset are both
+    index probes rather than a LIKE scan, and a semfield no longer matches every name containing its own.
+    """
+    hierarchy = f"{os.path.dirname(__file__)}/common/common_semfield_hierarchy.db"
+    if not os.path.exists(hierarchy):
+        raise FileNotFoundError("common_semfield_hierarchy is not compiled; compile('common', 'semfield_hierarchy') first")
+    common_semfield_hierarchy = sqlite3.connect(f"file:{pathname2url(hierarchy)}?mode=ro", uri=True)
+    try:
+        codes = dict(common_semfield_hierarchy.execute("SELECT english, code FROM semfield_hierarchy").fetchall())
+    finally:
+        common_semfield_hierarchy.close()
+
+    name = f"{language}_semfield_code"
+    tables = [
+        table for (table,) in db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'").fetchall()
+        if table != name and {'synset', 'english'} <= {row[1] for row in db.execute(f'PRAGMA table_info("{table}")')}
+    ]
+
+    def rows():
+        for table in tables:
+            for synset, english in db.execute(f'SELECT synset, english FROM "{table}"').fetchall():
+                for rank, semfield in enumerate((english or '').split()):
+                    if semfield in codes:
+                        yield synset, codes[semfield], semfield, rank
+
+    _replace(
+        db, name,
+        "synset TEXT NOT NULL, code INTEGER NOT NULL, english TEXT NOT NULL, rank INTEGER NOT NULL, PRIMARY KEY (synset, code)",
+        rows(), indexes=[('code', 'synset')]
+    )
+
+
+def trigrams(word: str) -> list:
+    """Returns the distinct trigrams of a word padded with '$$' at its end, so that every character (and every
+    pair of characters) of the word starts one of them."""
+    padded = f"{word}$$"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def _search(db: sqlite3.Connection, language: str, table: str):
+    """Builds {language}_search and {language}_trigrams from the lemmas of {language}_{table}.
+
+    One row per distinct lemma with its case-folded spelling (indexed, for prefixes) and that spelling reversed
+    (indexed, for suffixes), and one (trigram, search id) row per trigram of the folded spelling (for infixes),
+    so that WordNet.get(mode=...) probes indexes instead of scanning with LIKE. The trigrams reference an
+    explicit INTEGER PRIMARY KEY, which VACUUM leaves alone, rather than the implicit rowid.
+    """
+    lemmas = [row[0] for row in db.execute(f"SELECT DISTINCT lemma FROM {language}_{table} WHERE lemma IS NOT NULL ORDER BY lemma").fetchall()]
+
+    _replace(
+        db, f"{language}_search",
+        "id INTEGER PRIMARY KEY, lemma TEXT NOT NULL UNIQUE, folded TEXT NOT NULL, reversed TEXT NOT NULL",
+        ((id, lemma, lemma.lower(), lemma.lower()[::-1]) for id, lemma in enumerate(lemmas, 1)),
+        indexes=[('folded',), ('reversed',)]
+    )
+    _replace(
+        db, f"{language}_trigrams",
+        "trigram TEXT NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (trigram, id)",
+        ((trigram, id) for id, lemma in enumerate(lemmas, 1) for trigram in trigrams(lemma.lower()))
+    )
+
+
+def morpho_search(db: sqlite3.Connection, language: str):
+    """Builds the lemma search tables of {language}_morpho (see _search)."""
+    _search(db, language, 'morpho')
+
+
+def lemma_search(db: sqlite3.Connection, language: str):
+    """Builds the lemma search tables of {language}_lemma (see _search)."""
+    _search(db, language, 'lemma')
+
+
+# Builders to run after loading a table, by table (the part of the file name after the language)
+DERIVED = {
+    'index': [membership],
+    'synset': [glosses],
+    'relation': [hierarchy],
+    'semfield': [semfield_codes],
+    'morpho': [features, forms, morpho_search],
+    'lemma': [lemma_search],
+}
+
+# Builders only run when asked for (compile(..., closure=True)), by table
+OPTIONAL = {
+    'relation': [closure],
+}
+
+# The compiled table the builders of a table read from another database, by table; compile_all() compiles them
+# before the rest (adding them to its jobs if they are not compiled yet)
+PREREQUISITES = {
+    'relation': ('common', 'relation'),
+    'semfield': ('common', 'semfield_hierarchy'),
+}
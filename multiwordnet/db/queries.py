@@ -0,0 +1,122 @@
+""" Named, parameterised SQL statements for the WordNet databases
+
+Table (and some column) names cannot be bound as parameters, so each statement is a template that is
+formatted once per language; values are always bound with '?'. The formatted text is cached, so a given
+statement always reaches sqlite3 as the same string and is served from the connection's statement cache.
+"""
+
+from functools import lru_cache
+from itertools import islice
+
+# The most values bound to one IN (...) list; well below SQLite's limit on host parameters
+CHUNK_SIZE = 500
+
+STATEMENTS = {
+    # semfield_hierarchy (read once, by multiwordnet.hierarchy)
+    'semfield_hierarchy': "SELECT code, english, normal, hypers, hypons FROM semfield_hierarchy",
+
+    # semfield_code (derived from semfield)
+    'semfield_synsets': "SELECT synset FROM {language}_semfield_code WHERE code=?",
+    'synset_semfields': "SELECT code, english FROM {language}_semfield_code WHERE synset=? ORDER BY rank",
+    'semfield_codes_by_synsets': "SELECT synset, code FROM {language}_semfield_code WHERE synset IN ({parameters})",
+
+    # synset
+    'synsets': "SELECT * FROM {language}_synset",
+    'synsets_by_pos': "SELECT * FROM {language}_synset WHERE id LIKE ?",
+    'synset': "SELECT * FROM {language}_synset WHERE id=?",
+    'synset_word': "SELECT word FROM {language}_synset WHERE id=?",
+    'synset_word_and_phrase': "SELECT word, phrase FROM {language}_synset WHERE id=?",
+    'synset_gloss': "SELECT gloss FROM {language}_synset WHERE id=?",
+    'synsets_by_ids': "SELECT * FROM {language}_synset WHERE id IN ({parameters})",
+    'synset_ids_by_ids': "SELECT id FROM {language}_synset WHERE id IN ({parameters})",
+    'synset_words_by_ids': "SELECT id, word FROM {language}_synset WHERE id IN ({parameters})",
+
+    # gloss (derived from synset, FTS5)
+    'glosses_by_match': "SELECT id, gloss, rank FROM {language}_gloss WHERE {language}_gloss MATCH ?{pos} ORDER BY rank LIMIT ?",
+
+    # index
+    'index': "SELECT * FROM {language}_index",
+    'index_by_lemma': "SELECT {columns} FROM {language}_index WHERE lemma=?",
+    'index_by_lemmas': "SELECT lemma, id_n, id_v, id_a, id_r FROM {language}_index WHERE lemma IN ({parameters})",
+
+    # membership (derived from index)
+    'membership_lemmas': "SELECT lemma FROM {language}_membership WHERE synset=?",
+    'membership_synsets': "SELECT synset FROM {language}_membership WHERE lemma=? AND pos=? ORDER BY rank",
+    'membership_synsets_by_lemma': "SELECT pos, synset FROM {language}_membership WHERE lemma=? ORDER BY rank",
+    'membership_lemmas_by_synsets': "SELECT synset, lemma FROM {language}_membership WHERE synset IN ({parameters})",
+    'membership_by_lemmas': "SELECT lemma, pos, synset, rank FROM {language}_membership WHERE lemma IN ({parameters})",
+
+    # lemma
+    'lemmas': "SELECT lemma, pos FROM {language}_lemma{where}",
+    'lemmas_by_search': "SELECT DISTINCT lemma.lemma, lemma.pos FROM {language}_search AS search JOIN {language}_lemma AS lemma ON lemma.lemma = search.lemma{where} ORDER BY search.{order} LIMIT ? OFFSET ?",
+
+    # morpho
+    'morpho': "SELECT * FROM {language}_morpho{where}",
+    'morpho_lemmas': "SELECT lemma, pos, miscellanea, id FROM {language}_morpho{where}",
+    'morpho_raw': "SELECT lemma, pos, miscellanea FROM {language}_morpho{where}",
+    'morpho_lemmas_by_search': "SELECT morpho.lemma, morpho.pos, morpho.miscellanea, morpho.id FROM {language}_search AS search JOIN {language}_morpho AS morpho ON morpho.lemma = search.lemma{where} ORDER BY search.{order}, morpho.id LIMIT ? OFFSET ?",
+    'morpho_raw_by_search': "SELECT morpho.lemma, morpho.pos, morpho.miscellanea FROM {language}_search AS search JOIN {language}_morpho AS morpho ON morpho.lemma = search.lemma{where} ORDER BY search.{order}, morpho.id LIMIT ? OFFSET ?",
+    'morpho_by_features': "SELECT morpho.* FROM {language}_features AS features JOIN {language}_morpho AS morpho ON morpho.id = features.id{where}",
+    'morpho_by_lemmas': "SELECT * FROM {language}_morpho WHERE lemma IN ({parameters})",
+
+    # forms (derived from morpho)
+    'forms_by_form': "SELECT forms.form, forms.tag, morpho.* FROM {language}_forms AS forms JOIN {language}_morpho AS morpho ON morpho.id = forms.id WHERE forms.form=? ORDER BY morpho.id, forms.tag",
+
+    # synonyms
+    'synonyms': "SELECT lemma FROM {language}_synonyms WHERE pos=? AND syn=?",
+
+    # relation
+    'relations': "SELECT * FROM {language}_relation{where}",
+    'relations_by_source': "SELECT * FROM {language}_relation WHERE id_source=?",
+    'lexical_sources': "SELECT id_source, w_source FROM {language}_relation WHERE w_target=? AND type=?",
+    'lexical_targets': "SELECT id_target, w_target FROM {language}_relation WHERE w_source=? AND type=?",
+
+    # ancestry and depth (derived from relation)
+    'ancestry_by_synsets': "SELECT synset, rank, depth, ancestors FROM {language}_ancestry WHERE synset IN ({parameters})",
+    'depth_by_synset': "SELECT min_depth, max_depth FROM {language}_depth WHERE synset=?",
+    'max_depth_by_pos': "SELECT max(max_depth) FROM {language}_depth WHERE pos=?",
+    'ancestry_by_ranks': "SELECT synset, rank, depth FROM {language}_ancestry WHERE rank IN ({parameters})",
+
+    # closure (derived from relation, optional)
+    'closure_targets': "SELECT target, distance FROM {language}_closure WHERE source=? AND type=?{depth} ORDER BY distance, target",
+    'closure_sources': "SELECT source, distance FROM {language}_closure WHERE target=? AND type=?{depth} ORDER BY distance, source",
+    'table_exists': "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+}
+
+
+@lru_cache(maxsize=None)
+def sql(name: str, language: str = 'common', **kwargs) -> str:
+    """Returns the text of a named statement for the given language.
+
+    :param name: The name of the statement in STATEMENTS.
+    :param language: The language whose tables the statement reads.
+    :param kwargs: Any other template fields (column names, a WHERE clause built from '?' conditions).
+    :return: The SQL text, with every value left as a '?' parameter.
+    """
+    return STATEMENTS[name].format(language=language, **kwargs)
+
+
+def where(conditions) -> str:
+    """Joins a sequence of '?'-parameterised conditions into a WHERE clause ('' if there are none)."""
+    conditions = [condition for condition in conditions if condition]
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ''
+
+
+def prefix_range(prefix: str) -> tuple:
+    """Returns the bounds of 'column >= ? AND column < ?' matching the values that start with prefix, so that the
+    match is an index range rather than a LIKE scan."""
+    return prefix, prefix + '\U0010ffff'
+
+
+def parameters(count: int) -> str:
+    """Returns the '?' placeholders of an IN (...) list of count values."""
+    return ', '.join('?' * count)
+
+
+def chunks(values, size: int = CHUNK_SIZE):
+    """Splits values into tuples of at most size values, to be bound to IN (...) lists."""
+    values = iter(values)
+    chunk = tuple(islice(values, size))
+    while chunk:
+        yield chunk
+        chunk = tuple(islice(values, size))
@@ -0,0 +1,488 @@
+"""
+An in-memory, integer-indexed view of the semantic relations of a WordNet within the MultiWordNet.
+"""
+
+import math
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from multiwordnet import cache
+from multiwordnet.db import connect as db
+from multiwordnet.db.queries import sql
+
+_graphs = {}
+
+# The similarity metrics of RelationGraph.similarity()
+METRICS = ('path', 'lch', 'wup')
+
+# The relation types whose closure is materialised by RelationGraph.closures(): hypernymy and hyponymy, the
+# holonymies and meronymies, and entailment
+TRANSITIVE = ('@', '~', '#m', '#s', '#p', '%m', '%s', '%p', '*')
+
+
+class RelationGraph(object):
+    """
+    Holds the common relations and the relations of one language as compressed sparse row (CSR) adjacency
+    arrays, one pair per relation type, over synsets numbered 0..n-1.
+
+    language: The language whose relations are loaded alongside the common ones.
+    ids: The synset id of each node.
+    """
+
+    def __init__(self, language: str, rows: Iterable[tuple] = None):
+        """
+        :param language: The language whose relations are loaded alongside the common ones.
+        :param rows: (type, id_source, id_target, ...) relation rows to build the graph from instead of reading
+            the relation databases.
+        """
+        self._language = language
+        self._ids = []
+        self._nodes = {}
+        self._offsets = {}
+        self._targets = {}
+        self._predecessors = {}  # type -> the reversed CSR arrays, built on first use
+        self._depths = {}  # (type, 'max' or 'min') -> the depth of every node, computed on first use
+        self._ancestors = cache.IdentityMap()  # (type, node) -> the ancestors of node and their distances
+
+        if rows is None:
+            rows = self._rows(language)
+        edges = {}
+        for result in rows:
+            edges.setdefault(result[0], []).append((self.node(result[1], add=True), self.node(result[2], add=True)))
+
+        for type, pairs in edges.items():
+            offsets = array('i', [0]) * (len(self._ids) + 1)
+            for source, _ in pairs:
+                offsets[source + 1] += 1
+            for node in range(len(self._ids)):
+                offsets[node + 1] += offsets[node]
+            targets = array('i', [0]) * len(pairs)
+            filled = array('i', offsets[:-1])
+            for source, target in pairs:
+                targets[filled[source]] = target
+                filled[source] += 1
+            self._offsets[type] = offsets
+            self._targets[type] = targets
+
+    @staticmethod
+    def _rows(language: str) -> Iterator[tuple]:
+        for relation_language in dict.fromkeys(('common', language)):
+            relation = db(relation_language, "relation")
+            if relation:
+                relation.execute(sql('relations', relation_language, where=''))
+                yield from relation
+
+    @property
+    def language(self) -> str:
+        return str(self._language)
+
+    @property
+    def ids(self) -> List[str]:
+        return self._ids
+
+    @property
+    def types(self) -> List[str]:
+        return list(self._offsets)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, id: str):
+        return id in self._nodes
+
+    def node(self, id: str, add: bool = False) -> int:
+        """Returns the node number of a synset id (None if it takes part in no relation)."""
+        node = self._nodes.get(id)
+        if node is None and add:
+            node = self._nodes[id] = len(self._ids)
+            self._ids.append(id)
+        return node
+
+    def id(self, node: int) -> str:
+        return self._ids[node]
+
+    def successors(self, node: int, type: str) -> array:
+        """Returns the nodes that node is related to by a relation of the given type."""
+        offsets = self._offsets.get(type)
+        if offsets is None or node is None or node + 1 >= len(offsets):
+            return array('i')
+        return self._targets[type][offsets[node]:offsets[node + 1]]
+
+    def roots(self, node: int, type: str = '@') -> List[int]:
+        """Returns the topmost nodes reachable from node (node itself if it has no successors)."""
+        result = []
+        seen = set()
+        todo = [node]
+        while todo:
+            next_node = todo.pop()
+            if next_node not in seen:
+                seen.add(next_node)
+                successors = self.successors(next_node, type)
+                if not successors:
+                    result.append(next_node)
+                else:
+                    todo.extend(successors)
+        return result
+
+    def max_depth(self, node: int, type: str = '@') -> int:
+        """Returns the length of the longest path from node to a root. Edges closing a cycle are not followed."""
+        depths = {}
+        on_path = set()
+        stack = [(node, iter(self.successors(node, type)))]
+        on_path.add(node)
+        while stack:
+            current, successors = stack[-1]
+            for successor in successors:
+                if successor not in depths and successor not in on_path:
+                    on_path.add(successor)
+                    stack.append((successor, iter(self.successors(successor, type))))
+                    break
+            else:
+                stack.pop()
+                on_path.discard(current)
+                depths[current] = max(
+                    (1 + depths[successor] for successor in self.successors(current, type) if successor in depths),
+                    default=0
+                )
+        return depths[node]
+
+    def min_depth(self, node: int, type: str = '@') -> int:
+        """Returns the length of the shortest path from node to a root."""
+        seen = {node}
+        queue = deque([(node, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            successors = self.successors(current, type)
+            if not successors:
+                return depth
+            for successor in successors:
+                if successor not in seen:
+                    seen.add(successor)
+                    queue.append((successor, depth + 1))
+        return 0
+
+    def closure(self, node: int, type: str, depth: int = -1) -> Iterator[int]:
+        """Yields the nodes reachable from node under the given relation type, breadth-first, up to depth steps."""
+        seen = {node}
+        queue = deque([(node, 0)])
+        while queue:
+            current, distance = queue.popleft()
+            if distance == depth:
+                continue
+            for successor in self.successors(current, type):
+                if successor not in seen:
+                    seen.add(successor)
+                    yield successor
+                    queue.append((successor, distance + 1))
+
+    def paths_to_root(self, node: int, type: str = '@') -> List[List[int]]:
+        """Returns every path from a root to node, as lists of nodes starting at the root and ending at node."""
+        paths = {}
+
+        def walk(current: int, path: frozenset) -> List[tuple]:
+            if current not in paths:
+                successors = [successor for successor in self.successors(current, type) if successor not in path]
+                if not successors:
+                    paths[current] = [(current,)]
+                else:
+                    paths[current] = [
+                        ancestors + (current,)
+                        for successor in successors
+                        for ancestors in walk(successor, path | {current})
+                    ]
+            return paths[current]
+
+        return [list(path) for path in walk(node, frozenset())]
+
+    def predecessors(self, node: int, type: str) -> array:
+        """Returns the nodes related to node by a relation of the given type."""
+        if type not in self._predecessors:
+            offsets = self._offsets.get(type)
+            if offsets is None:
+                return array('i')
+            targets = self._targets[type]
+            reversed_offsets = array('i', [0]) * (len(self._ids) + 1)
+            for target in targets:
+                reversed_offsets[target + 1] += 1
+            for current in range(len(self._ids)):
+                reversed_offsets[current + 1] += reversed_offsets[current]
+            sources = array('i', [0]) * len(targets)
+            filled = array('i', reversed_offsets[:-1])
+            for source in range(len(offsets) - 1):
+                for target in targets[offsets[source]:offsets[source + 1]]:
+                    sources[filled[target]] = source
+                    filled[target] += 1
+            self._predecessors[type] = (reversed_offsets, sources)
+        offsets, sources = self._predecessors[type]
+        if node is None or node + 1 >= len(offsets):
+            return array('i')
+        return sources[offsets[node]:offsets[node + 1]]
+
+    def max_depths(self, type: str = '@') -> array:
+        """
+        Returns the max_depth() of every node, computed once in a single topological pass from the roots down
+        (the few nodes caught in a cycle fall back to max_depth()).
+        """
+        key = (type, 'max')
+        if key not in self._depths:
+            depths = array('i', [0]) * len(self._ids)
+            remaining = array('i', (len(self.successors(node, type)) for node in range(len(self._ids))))
+            queue = deque(node for node in range(len(self._ids)) if not remaining[node])
+            while queue:
+                current = queue.popleft()
+                for predecessor in self.predecessors(current, type):
+                    depths[predecessor] = max(depths[predecessor], depths[current] + 1)
+                    remaining[predecessor] -= 1
+                    if not remaining[predecessor]:
+                        queue.append(predecessor)
+            for node in range(len(self._ids)):
+                if remaining[node]:
+                    depths[node] = self.max_depth(node, type)
+            self._depths[key] = depths
+        return self._depths[key]
+
+    def min_depths(self, type: str = '@') -> array:
+        """Returns the min_depth() of every node, computed once by a breadth-first pass down from all the roots."""
+        key = (type, 'min')
+        if key not in self._depths:
+            depths = array('i', [-1]) * len(self._ids)
+            queue = deque()
+            for node in range(len(self._ids)):
+                if not self.successors(node, type):
+                    depths[node] = 0
+                    queue.append(node)
+            while queue:
+                current = queue.popleft()
+                for predecessor in self.predecessors(current, type):
+                    if depths[predecessor] < 0:
+                        depths[predecessor] = depths[current] + 1
+                        queue.append(predecessor)
+            for node in range(len(self._ids)):
+                if depths[node] < 0:  # no way to a root
+                    depths[node] = 0
+            self._depths[key] = depths
+        return self._depths[key]
+
+    def max_depth_for(self, pos: str, type: str = '@') -> int:
+        """Returns the greatest max_depth() of the synsets of a part of speech."""
+        key = (type, 'max', pos)
+        if key not in self._depths:
+            depths = self.max_depths(type)
+            self._depths[key] = max((depths[node] for node, id in enumerate(self._ids) if id.startswith(pos)), default=0)
+        return self._depths[key]
+
+    def ancestors(self, node: int, type: str = '@') -> Dict[int, int]:
+        """
+        Returns the nodes reachable from node under the given relation type (node itself included), each with the
+        length of the shortest path to it. The ancestors of the most recently used nodes are kept.
+        """
+        key = (type, node)
+        distances = self._ancestors.get(key)
+        if distances is cache.MISSING:
+            distances = self._ancestors.put(key, self.distances(node, type))
+        return distances
+
+    def distances(self, node: int, type: str = '@', reverse: bool = False) -> Dict[int, int]:
+        """
+        Returns the nodes reachable from node under the given relation type (node itself included), or, if reverse,
+        the nodes from which node is reachable, each with the length of the shortest path.
+        """
+        step = self.predecessors if reverse else self.successors
+        distances = {node: 0}
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            for following in step(current, type):
+                if following not in distances:
+                    distances[following] = distances[current] + 1
+                    queue.append(following)
+        return distances
+
+    def closures(self, types=TRANSITIVE) -> Iterator[Tuple[str, str, str, int]]:
+        """Yields a (source id, target id, type, distance) row for every node reachable from another under each type."""
+        for type in types:
+            for node in range(len(self._ids)):
+                if self.successors(node, type):
+                    for target, distance in self.distances(node, type).items():
+                        if target != node:
+                            yield self._ids[node], self._ids[target], type, distance
+
+    def ancestry(self, type: str = '@') -> Iterator[Tuple[str, int, int, bytes]]:
+        """
+        Yields an ancestor label for every node taking part in a relation of the given type, as (synset id, rank,
+        max depth, ancestors): nodes are ranked deepest first (by max_depth(), then id) and ancestors holds the
+        ranks of the node's ancestors (itself included) in ascending order, as the bytes of an array('i'). The
+        first rank two labels share is then their lowest common ancestor (see lowest_common_ranks()).
+        """
+        depths = self.max_depths(type)
+        nodes = [node for node in range(len(self._ids)) if self.successors(node, type) or self.predecessors(node, type)]
+        ranks = {node: rank for rank, node in enumerate(sorted(nodes, key=lambda node: (-depths[node], self._ids[node])))}
+        for node in nodes:
+            ancestors = {node}
+            todo = [node]
+            while todo:
+                for successor in self.successors(todo.pop(), type):
+                    if successor not in ancestors:
+                        ancestors.add(successor)
+                        todo.append(successor)
+            yield self._ids[node], ranks[node], depths[node], array('i', sorted(ranks[ancestor] for ancestor in ancestors)).tobytes()
+
+    def lowest_common_ancestors(self, a: int, b: int, type: str = '@') -> List[int]:
+        """Returns the deepest (by max_depth()) of the nodes reachable from both a and b, in node order."""
+        ancestors_a, ancestors_b = self.ancestors(a, type), self.ancestors(b, type)
+        if len(ancestors_b) < len(ancestors_a):
+            ancestors_a, ancestors_b = ancestors_b, ancestors_a
+        common = [node for node in ancestors_a if node in ancestors_b]
+        if not common:
+            return []
+        depths = self.max_depths(type)
+        deepest = max(depths[node] for node in common)
+        return sorted(node for node in common if depths[node] == deepest)
+
+    def shortest_distance(self, a: int, b: int, type: str = '@') -> int:
+        """Returns the length of the shortest path between a and b through a common ancestor, or None."""
+        ancestors_a, ancestors_b = self.ancestors(a, type), self.ancestors(b, type)
+        if len(ancestors_b) < len(ancestors_a):
+            ancestors_a, ancestors_b = ancestors_b, ancestors_a
+        return min((distance + ancestors_b[node] for node, distance in ancestors_a.items() if node in ancestors_b), default=None)
+
+    def similarity(self, a: int, b: int, metric: str = 'path', type: str = '@') -> float:
+        """
+        Scores how alike two nodes are under a hierarchical relation, or returns None if they share no ancestor.
+
+        path: 1 / (shortest distance + 1).
+        lch: Leacock-Chodorow, -log((shortest distance + 1) / (2 * the max_depth_for() the pos of a)).
+        wup: Wu-Palmer, 2 * depth / (distance from a + distance from b + 2 * depth), where depth is one more than
+            the max_depth() of their lowest common ancestor.
+        """
+        if metric == 'path':
+            distance = self.shortest_distance(a, b, type)
+            return None if distance is None else 1 / (distance + 1)
+        elif metric == 'lch':
+            distance = self.shortest_distance(a, b, type)
+            depth = self.max_depth_for(self._ids[a][0], type)
+            return None if distance is None or not depth else -math.log((distance + 1) / (2 * depth))
+        elif metric == 'wup':
+            subsumers = self.lowest_common_ancestors(a, b, type)
+            if not subsumers:
+                return None
+            subsumer = subsumers[0]
+            depth = self.max_depths(type)[subsumer] + 1
+            return 2 * depth / (self.ancestors(a, type)[subsumer] + self.ancestors(b, type)[subsumer] + 2 * depth)
+        else:
+            raise ValueError(f"unknown similarity metric '{metric}'; use one of {', '.join(METRICS)}")
+
+    def similarity_of(self, id_a: str, id_b: str, metric: str = 'path', type: str = '@') -> float:
+        """Returns the similarity() of two synset ids; a synset taking part in no relation is only like itself."""
+        a, b = self.node(id_a), self.node(id_b)
+        if a is not None and b is not None:
+            return self.similarity(a, b, metric, type)
+        elif metric not in METRICS:
+            raise ValueError(f"unknown similarity metric '{metric}'; use one of {', '.join(METRICS)}")
+        elif id_a != id_b:
+            return None
+        elif metric == 'lch':
+            depth = self.max_depth_for(id_a[0], type)
+            return -math.log(1 / (2 * depth)) if depth else None
+        else:
+            return 1.0
+
+    def similarity_rows(self, ids_a: List[str], ids_b: List[str], metric: str = 'path', type: str = '@') -> List[List[float]]:
+        """
+        Returns the similarity_of() every id of ids_a to every id of ids_b, one row per id of ids_a. Each id is
+        resolved to its node and its ancestors once, and the depths once, so a pair costs one pass over the
+        smaller of two ancestor dicts, with no per-pair lookups or method calls.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"unknown similarity metric '{metric}'; use one of {', '.join(METRICS)}")
+        depths = self.max_depths(type)
+        pos_depths = {id[0]: self.max_depth_for(id[0], type) for id in ids_a}
+        ancestors = {}  # id -> the ancestors of its node with their distances, or None if it has no node
+        for id in dict.fromkeys(ids_a + ids_b):
+            node = self.node(id)
+            ancestors[id] = None if node is None else self.ancestors(node, type)
+        column = [(id_b, ancestors[id_b]) for id_b in ids_b]
+
+        rows = []
+        for id_a in ids_a:
+            ancestors_a = ancestors[id_a]
+            depth = pos_depths[id_a[0]]
+            row = []
+            for id_b, ancestors_b in column:
+                if ancestors_a is None or ancestors_b is None:
+                    # a synset taking part in no relation is only like itself
+                    if id_a != id_b:
+                        row.append(None)
+                    elif metric == 'lch':
+                        row.append(-math.log(1 / (2 * depth)) if depth else None)
+                    else:
+                        row.append(1.0)
+                    continue
+                smaller, larger = (ancestors_a, ancestors_b) if len(ancestors_a) <= len(ancestors_b) else (ancestors_b, ancestors_a)
+                if metric == 'wup':
+                    subsumer = None
+                    for node in smaller:
+                        if node in larger and (subsumer is None or depths[node] > depths[subsumer]
+                                               or (depths[node] == depths[subsumer] and node < subsumer)):
+                            subsumer = node
+                    if subsumer is None:
+                        row.append(None)
+                    else:
+                        subsumer_depth = depths[subsumer] + 1
+                        row.append(2 * subsumer_depth / (ancestors_a[subsumer] + ancestors_b[subsumer] + 2 * subsumer_depth))
+                    continue
+                distance = None
+                for node, steps in smaller.items():
+                    other = larger.get(node)
+                    if other is not None and (distance is None or steps + other < distance):
+                        distance = steps + other
+                if distance is None:
+                    row.append(None)
+                elif metric == 'path':
+                    row.append(1 / (distance + 1))
+                else:
+                    row.append(-math.log((distance + 1) / (2 * depth)) if depth else None)
+            rows.append(row)
+        return rows
+
+
+def lowest_common_ranks(label_a: bytes, label_b: bytes) -> List[int]:
+    """
+    Returns the ranks two ancestor labels (see RelationGraph.ancestry()) have in common, in ascending order, i.e.
+    the common ancestors deepest first; a single merge of the two sorted labels.
+    """
+    a, b = array('i'), array('i')
+    a.frombytes(label_a)
+    b.frombytes(label_b)
+    common = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            common.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return common
+
+
+def load(language: str) -> RelationGraph:
+    """Loads (or reloads) the relation graph of a language and makes it the one its synsets traverse."""
+    _graphs[language] = RelationGraph(language)
+    return _graphs[language]
+
+
+def unload(language: str = None):
+    """Drops the relation graph of a language (by default every loaded graph)."""
+    if language is None:
+        _graphs.clear()
+    else:
+        _graphs.pop(language, None)
+
+
+def loaded(language: str) -> RelationGraph:
+    """Returns the loaded relation graph of a language, or None."""
+    return _graphs.get(language)
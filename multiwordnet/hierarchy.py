@@ -0,0 +1,155 @@
+"""
+The semfield hierarchy of the MultiWordNet, loaded once per process and held in memory.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from multiwordnet.db import connect as db
+from multiwordnet.db.queries import sql
+
+_hierarchy = None
+_lock = threading.Lock()
+
+
+class SemfieldHierarchy(object):
+    """
+    Holds every row of common_semfield_hierarchy, with the parents, children and normal semfield of each
+    semfield resolved to codes, so that walking the hierarchy is a dictionary lookup per step.
+
+    codes: The code of every semfield, in the order of the table.
+    """
+
+    def __init__(self, rows: Iterable[tuple] = None):
+        """
+        :param rows: (code, english, normal, hypers, hypons) rows to build the hierarchy from instead of reading
+            common_semfield_hierarchy.
+        """
+        if rows is None:
+            rows = self._rows()
+        rows = list(rows)
+        self._english = {}  # code -> english name
+        self._codes = {}  # english name -> codes
+        for code, english, *_ in rows:
+            self._english[code] = english
+            self._codes.setdefault(english, []).append(code)
+
+        def resolve(names: str) -> Tuple[int, ...]:
+            return tuple(code for name in (names or '').split() for code in self._codes.get(name, ()))
+
+        self._parents = {code: resolve(hypers) for code, english, normal, hypers, hypons in rows}
+        self._children = {code: resolve(hypons) for code, english, normal, hypers, hypons in rows}
+        self._normal = {code: next(iter(resolve(normal)), None) for code, english, normal, hypers, hypons in rows}
+        self._levels = self._depths()
+
+    @staticmethod
+    def _rows() -> List[tuple]:
+        common_semfield_hierarchy = db("common", "semfield_hierarchy")
+        if not common_semfield_hierarchy:
+            return []
+        common_semfield_hierarchy.execute(sql('semfield_hierarchy'))
+        return common_semfield_hierarchy.fetchall()
+
+    @property
+    def codes(self) -> List[int]:
+        return list(self._english)
+
+    def __len__(self):
+        return len(self._english)
+
+    def __contains__(self, code):
+        return self.key(code) in self._english
+
+    @staticmethod
+    def key(code):
+        """ The code as stored in the hierarchy (an int), from an int or a string of digits """
+        return int(code) if isinstance(code, str) and code.isdigit() else code
+
+    def english(self, code) -> str:
+        """ The English name of a semfield, or None """
+        return self._english.get(self.key(code))
+
+    def codes_of(self, english: str) -> List[int]:
+        """ The codes of the semfields with an English name """
+        return list(self._codes.get(english.replace(' ', '_'), ()))
+
+    def parents(self, code) -> Tuple[int, ...]:
+        """ The codes of the semfields immediately superordinate to a semfield """
+        return self._parents.get(self.key(code), ())
+
+    def children(self, code) -> Tuple[int, ...]:
+        """ The codes of the semfields immediately subordinate to a semfield """
+        return self._children.get(self.key(code), ())
+
+    def normal(self, code) -> int:
+        """ The code of the basic semfield a semfield belongs to, or None """
+        return self._normal.get(self.key(code))
+
+    def ancestors(self, code) -> Iterator[int]:
+        """ Yields the codes of every semfield above a semfield, nearest first """
+        return self._walk(code, self._parents)
+
+    def descendants(self, code) -> Iterator[int]:
+        """ Yields the codes of every semfield below a semfield, nearest first """
+        return self._walk(code, self._children)
+
+    def level(self, code) -> int:
+        """ The number of steps from a semfield up to the nearest top-level one (0 for a top-level semfield) """
+        return self._levels.get(self.key(code), 0)
+
+    def at_level(self, code, level: int) -> int:
+        """ The code of the semfield at a level above a semfield, or the semfield itself if it is not deeper """
+        code = self.key(code)
+        while self.level(code) > level and self.parents(code):
+            code = min(self.parents(code), key=self.level)
+        return code
+
+    def _depths(self) -> Dict[int, int]:
+        """ The level of every semfield, breadth first from the top-level ones """
+        below = {}
+        for code, parents in self._parents.items():
+            for parent in parents:
+                below.setdefault(parent, []).append(code)
+        levels = {code: 0 for code, parents in self._parents.items() if not parents}
+        queue = deque(levels)
+        while queue:
+            current = queue.popleft()
+            for code in below.get(current, ()):
+                if code not in levels:
+                    levels[code] = levels[current] + 1
+                    queue.append(code)
+        return levels
+
+    def _walk(self, code, edges: Dict[int, Tuple[int, ...]]) -> Iterator[int]:
+        code = self.key(code)
+        seen = {code}
+        queue = deque([code])
+        while queue:
+            for other in edges.get(queue.popleft(), ()):
+                if other not in seen:
+                    seen.add(other)
+                    queue.append(other)
+                    yield other
+
+    def __repr__(self):
+        return f"SemfieldHierarchy({len(self)} semfields)"
+
+
+def get() -> SemfieldHierarchy:
+    """Returns the semfield hierarchy, loading it from common_semfield_hierarchy on first use."""
+    global _hierarchy
+    if _hierarchy is None:
+        with _lock:
+            if _hierarchy is None:
+                semfield_hierarchy = SemfieldHierarchy()
+                if not len(semfield_hierarchy):
+                    return semfield_hierarchy  # not compiled yet; try again next time
+                _hierarchy = semfield_hierarchy
+    return _hierarchy
+
+
+def unload():
+    """Drops the loaded semfield hierarchy, e.g. after recompiling common_semfield_hierarchy."""
+    global _hierarchy
+    _hierarchy = None
@@ -0,0 +1,386 @@
+"""
+Generation of the inflected forms of Latin lemmas from their morphology (principal parts, group, gender, voice,
+irregular and alternative forms), each tagged with a positional tag in the format of {language}_morpho's
+miscellanea column.
+
+Lemmas that inflect alike share a paradigm class; the endings of a class are worked out once and cached, and a
+lemma's forms are its stems joined to them.
+"""
+
+from functools import lru_cache
+from typing import List, Tuple
+
+# person and number of the six finite forms of a tense, in order
+PERSONS = (('1', 's'), ('2', 's'), ('3', 's'), ('1', 'p'), ('2', 'p'), ('3', 'p'))
+
+# the case order of the declension tables below
+CASES = ('n', 'g', 'd', 'a', 'b', 'v')
+
+
+def tag(pos: str, person: str = '-', number: str = '-', tense: str = '-', mood: str = '-', voice: str = '-',
+        gender: str = '-', case: str = '-', group: str = '-', stem: str = '-') -> str:
+    """Builds a ten-character positional tag (see multiwordnet.tags.MorphoTag)."""
+    return f"{pos}{person}{number}{tense}{mood}{voice}{gender}{case}{group}{stem}"
+
+
+# Declensions: for each number, the ending of each case in CASES ('' where the form is the lemma itself)
+_NOUNS = {
+    '1': {'s': ('', 'ae', 'ae', 'am', 'a', ''), 'p': ('ae', 'arum', 'is', 'as', 'is', 'ae')},
+    '2': {'s': ('', 'i', 'o', 'um', 'o', ''), 'p': ('i', 'orum', 'is', 'os', 'is', 'i')},
+    '2n': {'s': ('', 'i', 'o', '', 'o', ''), 'p': ('a', 'orum', 'is', 'a', 'is', 'a')},
+    '3': {'s': ('', 'is', 'i', 'em', 'e', ''), 'p': ('es', 'um', 'ibus', 'es', 'ibus', 'es')},
+    '3i': {'s': ('', 'is', 'i', 'em', 'e', ''), 'p': ('es', 'ium', 'ibus', 'es', 'ibus', 'es')},
+    '3n': {'s': ('', 'is', 'i', '', 'e', ''), 'p': ('a', 'um', 'ibus', 'a', 'ibus', 'a')},
+    '3in': {'s': ('', 'is', 'i', '', 'i', ''), 'p': ('ia', 'ium', 'ibus', 'ia', 'ibus', 'ia')},
+    '4': {'s': ('', 'us', 'ui', 'um', 'u', ''), 'p': ('us', 'uum', 'ibus', 'us', 'ibus', 'us')},
+    '4n': {'s': ('', 'us', 'u', '', 'u', ''), 'p': ('ua', 'uum', 'ibus', 'ua', 'ibus', 'ua')},
+    '5': {'s': ('', 'ei', 'ei', 'em', 'e', ''), 'p': ('es', 'erum', 'ebus', 'es', 'ebus', 'es')},
+}
+
+# Conjugations, by class ('1', '2', '3', '3i' for the i-stems of the 3rd, '4')
+_CONJUGATIONS = ('1', '2', '3', '3i', '4')
+_VOWEL = {'1': 'a', '2': 'e', '3': 'e', '3i': 'ie', '4': 'ie'}
+_PRESENT_INFINITIVE = {'1': 'are', '2': 'ere', '3': 'ere', '3i': 'ere', '4': 'ire'}
+_PASSIVE_INFINITIVE = {'1': 'ari', '2': 'eri', '3': 'i', '3i': 'i', '4': 'iri'}
+_PARTICIPLE = {'1': 'ant', '2': 'ent', '3': 'ent', '3i': 'ient', '4': 'ient'}
+_GERUND = {'1': 'and', '2': 'end', '3': 'end', '3i': 'iend', '4': 'iend'}
+
+_ACTIVE = {
+    # (tense, mood): endings by conjugation
+    ('p', 'i'): {
+        '1': ('o', 'as', 'at', 'amus', 'atis', 'ant'),
+        '2': ('eo', 'es', 'et', 'emus', 'etis', 'ent'),
+        '3': ('o', 'is', 'it', 'imus', 'itis', 'unt'),
+        '3i': ('io', 'is', 'it', 'imus', 'itis', 'iunt'),
+        '4': ('io', 'is', 'it', 'imus', 'itis', 'iunt'),
+    },
+    ('i', 'i'): {
+        conjugation: tuple(_VOWEL[conjugation] + ending for ending in ('bam', 'bas', 'bat', 'bamus', 'batis', 'bant'))
+        for conjugation in _CONJUGATIONS
+    },
+    ('f', 'i'): {
+        '1': ('abo', 'abis', 'abit', 'abimus', 'abitis', 'abunt'),
+        '2': ('ebo', 'ebis', 'ebit', 'ebimus', 'ebitis', 'ebunt'),
+        '3': ('am', 'es', 'et', 'emus', 'etis', 'ent'),
+        '3i': ('iam', 'ies', 'iet', 'iemus', 'ietis', 'ient'),
+        '4': ('iam', 'ies', 'iet', 'iemus', 'ietis', 'ient'),
+    },
+    ('p', 's'): {
+        '1': ('em', 'es', 'et', 'emus', 'etis', 'ent'),
+        '2': ('eam', 'eas', 'eat', 'eamus', 'eatis', 'eant'),
+        '3': ('am', 'as', 'at', 'amus', 'atis', 'ant'),
+        '3i': ('iam', 'ias', 'iat', 'iamus', 'iatis', 'iant'),
+        '4': ('iam', 'ias', 'iat', 'iamus', 'iatis', 'iant'),
+    },
+    ('i', 's'): {
+        conjugation: tuple(_PRESENT_INFINITIVE[conjugation] + ending for ending in ('m', 's', 't', 'mus', 'tis', 'nt'))
+        for conjugation in _CONJUGATIONS
+    },
+}
+
+_PASSIVE = {
+    ('p', 'i'): {
+        '1': ('or', 'aris', 'atur', 'amur', 'amini', 'antur'),
+        '2': ('eor', 'eris', 'etur', 'emur', 'emini', 'entur'),
+        '3': ('or', 'eris', 'itur', 'imur', 'imini', 'untur'),
+        '3i': ('ior', 'eris', 'itur', 'imur', 'imini', 'iuntur'),
+        '4': ('ior', 'iris', 'itur', 'imur', 'imini', 'iuntur'),
+    },
+    ('i', 'i'): {
+        conjugation: tuple(_VOWEL[conjugation] + ending for ending in ('bar', 'baris', 'batur', 'bamur', 'bamini', 'bantur'))
+        for conjugation in _CONJUGATIONS
+    },
+    ('f', 'i'): {
+        '1': ('abor', 'aberis', 'abitur', 'abimur', 'abimini', 'abuntur'),
+        '2': ('ebor', 'eberis', 'ebitur', 'ebimur', 'ebimini', 'ebuntur'),
+        '3': ('ar', 'eris', 'etur', 'emur', 'emini', 'entur'),
+        '3i': ('iar', 'ieris', 'ietur', 'iemur', 'iemini', 'ientur'),
+        '4': ('iar', 'ieris', 'ietur', 'iemur', 'iemini', 'ientur'),
+    },
+    ('p', 's'): {
+        '1': ('er', 'eris', 'etur', 'emur', 'emini', 'entur'),
+        '2': ('ear', 'earis', 'eatur', 'eamur', 'eamini', 'eantur'),
+        '3': ('ar', 'aris', 'atur', 'amur', 'amini', 'antur'),
+        '3i': ('iar', 'iaris', 'iatur', 'iamur', 'iamini', 'iantur'),
+        '4': ('iar', 'iaris', 'iatur', 'iamur', 'iamini', 'iantur'),
+    },
+    ('i', 's'): {
+        conjugation: tuple(_PRESENT_INFINITIVE[conjugation] + ending for ending in ('r', 'ris', 'tur', 'mur', 'mini', 'ntur'))
+        for conjugation in _CONJUGATIONS
+    },
+}
+
+_PERFECT = {
+    ('r', 'i'): ('i', 'isti', 'it', 'imus', 'istis', 'erunt'),
+    ('l', 'i'): ('eram', 'eras', 'erat', 'eramus', 'eratis', 'erant'),
+    ('t', 'i'): ('ero', 'eris', 'erit', 'erimus', 'eritis', 'erint'),
+    ('r', 's'): ('erim', 'eris', 'erit', 'erimus', 'eritis', 'erint'),
+    ('l', 's'): ('issem', 'isses', 'isset', 'issemus', 'issetis', 'issent'),
+}
+
+_IMPERATIVE = {
+    'a': {'1': ('a', 'ate'), '2': ('e', 'ete'), '3': ('e', 'ite'), '3i': ('e', 'ite'), '4': ('i', 'ite')},
+    'p': {'1': ('are', 'amini'), '2': ('ere', 'emini'), '3': ('ere', 'imini'), '3i': ('ere', 'imini'), '4': ('ire', 'imini')},
+}
+
+
+def _declension(stem: str, table: str, numbers: str = 'sp', nominative: str = 'lemma', vocative: str = None):
+    """ (stem, ending, number, case) entries of a noun declension; the nominative (and the forms equal to it)
+    come from the nominative stem with no ending """
+    entries = []
+    for number in numbers:
+        for case, ending in zip(CASES, _NOUNS[table][number]):
+            if ending:
+                entries.append((stem, ending, number, case))
+            elif case == 'v' and vocative is not None:
+                entries.append(vocative + (number, case))
+            else:
+                entries.append((nominative, '', number, case))
+    return entries
+
+
+def _adjective(kind: str, masculine: str, feminine: str, neuter: str, nominatives: dict):
+    """ (stem, ending, number, gender, case) entries of an adjectival declension
+
+    kind: '12' (1st/2nd declension), '3' or '3i' (3rd declension, consonant or i-stem).
+    nominatives: the (stem, ending) of the nominative singular of each gender.
+    """
+    entries = []
+    for gender in 'mfn':
+        if kind == '12':
+            stem = {'m': masculine, 'f': feminine, 'n': neuter}[gender]
+            table = {'m': '2', 'f': '1', 'n': '2n'}[gender]
+        else:
+            stem = masculine
+            table = (kind + 'n') if gender == 'n' else kind
+        for number in 'sp':
+            for case, ending in zip(CASES, _NOUNS[table][number]):
+                if number == 's' and (case in ('n', 'v') or (gender == 'n' and case == 'a')):
+                    if case == 'v' and gender == 'm' and kind == '12' and nominatives['m'][1] == 'us':
+                        entries.append((stem, 'e', number, gender, case))
+                    else:
+                        entries.append(nominatives[gender] + (number, gender, case))
+                elif kind == '3i' and number == 's' and case == 'b':
+                    entries.append((stem, 'i', number, gender, case))
+                else:
+                    entries.append((stem, ending, number, gender, case))
+    return entries
+
+
+def paradigm_class(lemma: str, pos: str, miscellanea: str) -> tuple:
+    """Returns the key of the paradigm a lemma inflects by: lemmas with the same key take the same endings."""
+    miscellanea = miscellanea if miscellanea and len(miscellanea) == 10 else '-' * 10
+    if pos == 'n':
+        return (pos, miscellanea[2], miscellanea[6], miscellanea[8], miscellanea[9],
+                lemma.endswith('us') and miscellanea[8] == '2')
+    elif pos == 'a':
+        return (pos, miscellanea[6], miscellanea[8], miscellanea[9], lemma.endswith('us') or lemma.endswith('os'))
+    elif pos == 'v':
+        return (pos, miscellanea[5], miscellanea[8], miscellanea[9])
+    else:
+        return (pos, miscellanea)
+
+
+@lru_cache(maxsize=None)
+def endings(key: tuple) -> Tuple[Tuple[str, str, str], ...]:
+    """Returns the (stem, ending, tag) entries of a paradigm class, where stem names one of the stems() of a lemma."""
+    pos = key[0]
+    entries = []
+    if pos == 'n':
+        _, number, gender, group, stem, vocative_e = key
+        if group in ('1', '2', '3', '4', '5'):
+            neuter = gender == 'n' and group in ('2', '3', '4')
+            table = group + ('i' if group == '3' and stem == 'i' else '') + ('n' if neuter else '')
+            numbers = 'p' if number == 'p' else 'sp'
+            for stem_name, ending, entry_number, case in _declension(
+                    'stem', table, numbers,
+                    vocative=('stem', 'e') if vocative_e else None):
+                if number == 'p' and case in ('n', 'v') or number == 'p' and neuter and case == 'a':
+                    stem_name, ending = 'lemma', ''
+                entries.append((stem_name, ending, tag('n', '-', entry_number, gender=gender, case=case, group=group, stem=stem)))
+        else:
+            entries.append(('lemma', '', tag('n', '-', number, gender=gender, case='n', group=group, stem=stem)))
+    elif pos == 'a':
+        _, gender, group, stem, second_declension = key
+        if group == '1':
+            nominatives = {'m': ('lemma', ''), 'f': ('feminine', 'a'), 'n': ('neuter', 'um')}
+            if second_declension:
+                nominatives['m'] = ('masculine', 'us')
+            declension = _adjective('12', 'masculine', 'feminine', 'neuter', nominatives)
+        elif group == '3':
+            kind = '3i' if stem == 'i' else '3'
+            if gender == 'm':
+                nominatives = {'m': ('lemma', ''), 'f': ('masculine', 'is'), 'n': ('masculine', 'e')}
+            elif gender == 'c':
+                nominatives = {'m': ('lemma', ''), 'f': ('lemma', ''), 'n': ('masculine', 'e')}
+            else:
+                nominatives = {'m': ('lemma', ''), 'f': ('lemma', ''), 'n': ('lemma', '')}
+            declension = _adjective(kind, 'masculine', 'masculine', 'masculine', nominatives)
+        else:
+            declension = []
+            entries.append(('lemma', '', tag('a', 'p', 's', gender=gender, case='n', group=group, stem=stem)))
+        for stem_name, ending, number, entry_gender, case in declension:
+            entries.append((stem_name, ending, tag('a', 'p', number, gender=entry_gender, case=case, group=group, stem=stem)))
+        if declension:
+            comparative = _adjective('3', 'comparative', 'comparative', 'comparative',
+                                     {'m': ('comparative', ''), 'f': ('comparative', ''), 'n': ('comparative_neuter', '')})
+            for stem_name, ending, number, entry_gender, case in comparative:
+                entries.append((stem_name, ending, tag('a', 'c', number, gender=entry_gender, case=case, group='3')))
+            superlative = _adjective('12', 'superlative', 'superlative', 'superlative',
+                                     {'m': ('superlative', 'us'), 'f': ('superlative', 'a'), 'n': ('superlative', 'um')})
+            for stem_name, ending, number, entry_gender, case in superlative:
+                entries.append((stem_name, ending, tag('a', 's', number, gender=entry_gender, case=case, group='1')))
+    elif pos == 'v':
+        _, voice, group, stem = key
+        if group not in ('1', '2', '3', '4'):
+            return ()
+        conjugation = '3i' if group == '3' and stem == 'i' else group
+        passive_voice = 'd' if voice == 'd' else 'p'
+
+        def finite(stem_name, table, tense, mood, entry_voice):
+            for (person, number), ending in zip(PERSONS, table):
+                entries.append((stem_name, ending, tag('v', person, number, tense, mood, entry_voice, group=group, stem=stem)))
+
+        def participle(stem_name, kind, nominatives, tense, mood, entry_voice):
+            declension = _adjective(kind, stem_name, stem_name, stem_name, nominatives)
+            for stem_name, ending, number, gender, case in declension:
+                entries.append((stem_name, ending, tag('v', '-', number, tense, mood, entry_voice, gender, case, group, stem)))
+
+        if voice != 'd':
+            for (tense, mood), table in _ACTIVE.items():
+                finite('present', table[conjugation], tense, mood, 'a')
+            entries.append(('present', _PRESENT_INFINITIVE[conjugation], tag('v', '-', '-', 'p', 'n', 'a', group=group, stem=stem)))
+            singular, plural = _IMPERATIVE['a'][conjugation]
+            entries.append(('present', singular, tag('v', '2', 's', 'p', 'm', 'a', group=group, stem=stem)))
+            entries.append(('present', plural, tag('v', '2', 'p', 'p', 'm', 'a', group=group, stem=stem)))
+            for (tense, mood), table in _PERFECT.items():
+                finite('perfect', table, tense, mood, 'a')
+            entries.append(('perfect', 'isse', tag('v', '-', '-', 'r', 'n', 'a', group=group, stem=stem)))
+        for (tense, mood), table in _PASSIVE.items():
+            finite('present', table[conjugation], tense, mood, passive_voice)
+        entries.append(('present', _PASSIVE_INFINITIVE[conjugation], tag('v', '-', '-', 'p', 'n', passive_voice, group=group, stem=stem)))
+        singular, plural = _IMPERATIVE['p'][conjugation]
+        entries.append(('present', singular, tag('v', '2', 's', 'p', 'm', passive_voice, group=group, stem=stem)))
+        entries.append(('present', plural, tag('v', '2', 'p', 'p', 'm', passive_voice, group=group, stem=stem)))
+
+        present = _PARTICIPLE[conjugation]
+        participle('present_participle', '3i', {gender: ('present', present[:-1] + 's') for gender in 'mfn'}, 'p', 'p', 'a')
+        participle('future_participle', '12', {'m': ('future_participle', 'us'), 'f': ('future_participle', 'a'), 'n': ('future_participle', 'um')}, 'f', 'p', 'a')
+        participle('supine', '12', {'m': ('supine', 'us'), 'f': ('supine', 'a'), 'n': ('supine', 'um')}, 'r', 'p', passive_voice)
+        participle('gerundive', '12', {'m': ('gerundive', 'us'), 'f': ('gerundive', 'a'), 'n': ('gerundive', 'um')}, '-', 'd', 'a')
+        for case, ending in (('g', 'i'), ('d', 'o'), ('a', 'um'), ('b', 'o')):
+            entries.append(('gerundive', ending, tag('v', '-', 's', '-', 'g', 'a', 'n', case, group, stem)))
+    return tuple(entries)
+
+
+def stems(lemma: str, pos: str, principal_parts: List[str], miscellanea: str) -> dict:
+    """Returns the stems a lemma's endings() attach to ('-' in the principal parts marks a missing stem)."""
+    parts = [part if part and part != '-' else None for part in principal_parts]
+    result = {'lemma': lemma}
+    if pos == 'n':
+        result['stem'] = parts[0] if parts else None
+    elif pos == 'a':
+        parts = (parts + [None] * 3)[:3]
+        masculine = parts[0]
+        result.update(masculine=masculine, feminine=parts[1] or masculine, neuter=parts[2] or masculine)
+        if masculine:
+            result['comparative'] = masculine + 'ior'
+            result['comparative_neuter'] = masculine + 'ius'
+            result['superlative'] = (lemma + 'rim') if lemma.endswith('er') else (masculine + 'issim')
+    elif pos == 'v':
+        deponent = miscellanea and len(miscellanea) == 10 and miscellanea[5] == 'd'
+        if len(parts) == 2:
+            present, perfect, supine = None, parts[0], parts[1]
+        else:
+            present, perfect, supine = (parts + [None] * 3)[:3]
+        if deponent:
+            perfect, supine = None, perfect
+        group = miscellanea[8] if miscellanea and len(miscellanea) == 10 else None
+        conjugation = '3i' if group == '3' and miscellanea[9] == 'i' else group
+        result.update(present=present, perfect=perfect, supine=supine)
+        if present and conjugation in _PARTICIPLE:
+            result['present_participle'] = present + _PARTICIPLE[conjugation]
+            result['gerundive'] = present + _GERUND[conjugation]
+        if supine:
+            result['future_participle'] = supine + 'ur'
+    return result
+
+
+# The stems of the declined sub-paradigms (degrees, gerund and gerundive) that an irregular form of the sub-paradigm
+# replaces: the rest of the sub-paradigm is then declined from the stem the irregular form gives, not the regular one
+_IRREGULAR_STEMS = ('comparative', 'comparative_neuter', 'superlative', 'gerundive')
+
+
+@lru_cache(maxsize=None)
+def _entries_by_tag(key: tuple) -> dict:
+    """ The (stem, ending) entries of a paradigm class, by tag """
+    entries = {}
+    for stem, ending, entry_tag in endings(key):
+        entries.setdefault(entry_tag, []).append((stem, ending))
+    return entries
+
+
+def _covered(irregular_tag: str) -> Tuple[str, ...]:
+    """ The tags of the generated forms an irregular form replaces: its own, and for the common gender ('c') those
+    of the masculine and the feminine """
+    if len(irregular_tag) == 10 and irregular_tag[6] == 'c':
+        return irregular_tag, irregular_tag[:6] + 'm' + irregular_tag[7:], irregular_tag[:6] + 'f' + irregular_tag[7:]
+    return irregular_tag,
+
+
+def _irregular_stems(key: tuple, irregular: dict) -> dict:
+    """ The _IRREGULAR_STEMS given by irregular forms (by tag), None for a stem an irregular form does not end like
+    the sub-paradigm, whose regular forms are then dropped """
+    entries = _entries_by_tag(key)
+    result = {}
+    for irregular_tag, forms in irregular.items():
+        for covered in _covered(irregular_tag):
+            for stem, ending in entries.get(covered, ()):
+                if stem in _IRREGULAR_STEMS and result.get(stem) is None:
+                    result[stem] = forms[0][:len(forms[0]) - len(ending)] if forms[0].endswith(ending) else None
+    if result.get('comparative') and 'comparative_neuter' not in result:
+        comparative = result['comparative']
+        result['comparative_neuter'] = comparative[:-2] + 'us' if comparative.endswith('or') else None
+    return result
+
+
+def inflect(lemma: str, pos: str, principal_parts: List[str], irregular_forms: List[Tuple[str, str]] = (),
+            alternative_forms: List[Tuple[str, str]] = (), miscellanea: str = None) -> List[Tuple[str, str]]:
+    """
+    Generates the inflected forms of a lemma.
+
+    :param principal_parts: The stems of Morpho.principal_parts.
+    :param irregular_forms: (tag, form) pairs, as in Morpho.irregular_forms; each replaces the generated forms
+        with the same tag (or, for the common gender, the masculine and feminine ones), or is added if there are
+        none. An irregular comparative, superlative, gerund or gerundive also replaces the stem the rest of its
+        declension is generated from (e.g. melior, melioris for bonus), or drops that declension if the stem
+        cannot be told from it.
+    :param alternative_forms: (tag, form) pairs, as in Morpho.alternative_forms; each is added.
+    :return: (form, tag) pairs, without duplicates; the lemma itself is always among the forms.
+
+    >>> forms = inflect('bonus', 'a', ['bon', 'bon', 'bon'], [('acs---mn3-', 'melior'), ('acs---nn3-', 'melius')],
+    ...                 miscellanea='aps---mn1-')
+    >>> ('melioris', 'acs---mg3-') in forms, any(form.startswith('bonior') for form, _ in forms)
+    (True, False)
+    """
+    irregular = {}
+    for irregular_tag, form in irregular_forms:
+        irregular.setdefault(irregular_tag, []).append(form)
+    covered = {covered for irregular_tag in irregular for covered in _covered(irregular_tag)}
+
+    key = paradigm_class(lemma, pos, miscellanea)
+    lemma_stems = stems(lemma, pos, principal_parts, miscellanea)
+    if irregular:
+        lemma_stems.update(_irregular_stems(key, irregular))
+    forms = [
+        (lemma_stems[stem] + ending, form_tag)
+        for stem, ending, form_tag in endings(key)
+        if lemma_stems.get(stem)
+    ]
+    if not any(form == lemma for form, _ in forms):
+        forms.insert(0, (lemma, miscellanea or tag(pos)))
+
+    forms = [(form, form_tag) for form, form_tag in forms if form_tag not in covered or form == lemma]
+    forms += [(form, irregular_tag) for irregular_tag, irregular_forms in irregular.items() for form in irregular_forms]
+    forms += [(form, alternative_tag) for alternative_tag, form in alternative_forms]
+    return list(dict.fromkeys(forms))
@@ -0,0 +1,61 @@
+"""
+Decoding of the positional morphological tags (the miscellanea column of {language}_morpho).
+"""
+
+from functools import lru_cache
+
+
+class MorphoTag(object):
+    """
+    The features of a positional morphological tag (Morpho.miscellanea), decoded once per distinct tag.
+
+    Each feature is the character at its position in the ten-character tag if it is one of the values accepted
+    there, and '' otherwise (or for a malformed tag). person and degree share position 1.
+    """
+
+    __slots__ = ('pos', 'person', 'degree', 'number', 'tense', 'mood', 'voice', 'gender', 'case', 'group', 'stem',
+                 'istem')
+
+    # feature, position in the tag, accepted values (None for the character classes checked in _accepts)
+    FEATURES = (
+        ('pos', 0, 'nvarpusct'),
+        ('person', 1, '123'),
+        ('degree', 1, 'pcs'),
+        ('number', 2, 'sp'),
+        ('tense', 3, 'pfirlt'),
+        ('mood', 4, 'nimspgd'),
+        ('voice', 5, 'apmds'),
+        ('gender', 6, 'mfnca'),
+        ('case', 7, 'ngdabvl'),
+        ('group', 8, None),
+        ('stem', 9, None),
+        ('istem', 9, 'i-'),
+    )
+
+    def __init__(self, miscellanea: str):
+        valid = len(miscellanea) == 10 and not any(character.isspace() for character in miscellanea)
+        for feature, position, values in self.FEATURES:
+            value = miscellanea[position] if valid else ''
+            setattr(self, feature, value if valid and self._accepts(feature, value, values) else '')
+
+    @staticmethod
+    def _accepts(feature: str, value: str, values: str) -> bool:
+        if values is not None:
+            return value in values
+        elif feature == 'group':
+            return value.isdecimal() or value == '-'
+        else:
+            return value.isalnum() or value in ('_', '-')
+
+    @property
+    def is_istem(self) -> bool:
+        return self.istem == 'i'
+
+    def __repr__(self):
+        return f"MorphoTag({', '.join(f'{feature}={getattr(self, feature)!r}' for feature in self.__slots__)})"
+
+
+@lru_cache(maxsize=None)
+def decode(miscellanea: str) -> MorphoTag:
+    """Returns the decoded features of a morphological tag; every Morpho with the same tag shares them."""
+    return MorphoTag(miscellanea or '')
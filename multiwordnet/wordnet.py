@@ -2,19 +2,43 @@
 A helper library for accessing and manipulating WordNets within the MultiWordNet.
 """
 
-import re
-from collections import deque
+from collections import Counter, deque, namedtuple
 from functools import lru_cache
+from itertools import islice
 from sqlite3 import OperationalError
-from typing import Generator, Iterable, List, Tuple
+from typing import Dict, Generator, Iterable, List, Optional, Tuple, Union
 
+from multiwordnet import cache, graph, hierarchy
 from multiwordnet.db import connect as db
+from multiwordnet.db.queries import CHUNK_SIZE, chunks, parameters, prefix_range, sql, where
+from multiwordnet.inflection import inflect
+from multiwordnet.tags import MorphoTag, decode
 
 
 class POSError(Exception):
     pass
 
 
+# The outcome of looking up one (lemma, pos) pair with WordNet.lookup_many(). status is 'found' (result is the
+# Lemma), 'ambiguous' (result is a tuple of the candidate parts of speech, or of morpho ids for Latin) or
+# 'missing' (result is None).
+Lookup = namedtuple('Lookup', ['lemma', 'pos', 'status', 'result'])
+
+# One reading of an inflected form given by WordNet.analyze(): the Lemma it is a form of and its positional tag,
+# raw and decoded.
+Analysis = namedtuple('Analysis', ['form', 'lemma', 'miscellanea', 'tag'])
+
+# The full paradigm of a lemma given by WordNet.paradigms(): its (form, miscellanea) pairs, as Morpho.paradigm()
+Paradigm = namedtuple('Paradigm', ['lemma', 'forms'])
+
+# A candidate translation given by WordNet.translate(): a lemma of the target language and part of speech, and the
+# synsets it shares with the translated lemma (their number ranks the candidates)
+Translation = namedtuple('Translation', ['lemma', 'pos', 'language', 'synsets'])
+
+# Enclitics WordNet.analyze() strips from a form it finds no reading of
+ENCLITICS = ('que', 'ne', 've')
+
+
 class Semfield(object):
     """
     Represents a semfield (semantic field) within the MultiWordNet.
@@ -29,34 +53,18 @@ class Semfield(object):
 
     def __new__(cls, english, code=None, language='common'):
         english = english.replace(' ', '_')
-        try:
-            common_semfield_hierarchy = db("common", "semfield_hierarchy")
-
-            if code:
-                query = f'english="{english}" AND code="{code}"'
-            else:
-                query = f'english="{english}"'
-
-            if common_semfield_hierarchy:
-                common_semfield_hierarchy.execute(f'SELECT code, english FROM semfield_hierarchy WHERE {query}')
-                results = common_semfield_hierarchy.fetchall()
-            else:
-                results = None
-        except OperationalError:
-            raise
-        else:
-            if not results:
-                instance = None
-            else:
-                if len(results) > 1 and code is None:
-                    results_codes = [result[0] for result in results]
-                    raise ValueError(f'cannot disambiguate "{english}" between "{", ".join(results_codes)}"')
-                else:
-                    instance = super().__new__(cls)
-                    instance._code = results[0][0]
-                    instance._english = results[0][1]
-                    instance._language = language
-            return instance
+        codes = hierarchy.get().codes_of(english)
+        if code:
+            codes = [result for result in codes if result == hierarchy.SemfieldHierarchy.key(code)]
+        if not codes:
+            return None
+        if len(codes) > 1 and code is None:
+            raise ValueError(f'cannot disambiguate "{english}" between "{", ".join(str(result) for result in codes)}"')
+        instance = super().__new__(cls)
+        instance._code = codes[0]
+        instance._english = english
+        instance._language = language
+        return instance
 
     def __init__(self, english, code=None, language='common'):
         self._english = english
@@ -79,7 +87,7 @@ class Semfield(object):
                 common_semfield = db("common", "semfield")
 
                 if common_semfield:
-                    common_semfield.execute(f'SELECT synset FROM semfield WHERE english LIKE "%{self._english}%"')
+                    common_semfield.execute(sql('semfield_synsets'), (self.code,))
                     common_results = common_semfield.fetchall()
                 else:
                     common_results = None
@@ -90,10 +98,10 @@ class Semfield(object):
                     for result in common_results:
                         temp.append(Synset(result[0], self.language))
             try:
-                language_semfield = db(self.language, "semfield")
+                language_semfield = db(self.language, "semfield") if self.language != 'common' else None
 
                 if language_semfield:
-                    language_semfield.execute(f'SELECT synset FROM semfield WHERE english LIKE "%{self._english}%"')
+                    language_semfield.execute(sql('semfield_synsets', self.language), (self.code,))
                     language_results = language_semfield.fetchall()
                 else:
                     language_results = None
@@ -109,95 +117,43 @@ class Semfield(object):
     @property
     def hypers(self) -> List['Semfield']:
         if not self._hypers:
-            temp = []
-            try:
-                semfield_hierarchy = db("common", "semfield_hierarchy")
-
-                if semfield_hierarchy:
-                    semfield_hierarchy.execute(f'SELECT hypers FROM semfield_hierarchy WHERE english="{self._english}" AND code="{self.code}"')
-                    result = semfield_hierarchy.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    for hyper in result[0].split(' '):
-                        if hyper and hyper != '':
-                            semfield_hierarchy.execute(f'SELECT code, english FROM semfield_hierarchy WHERE english="{hyper}"')  # AND code LIKE "{self.code[:2]}%"')
-                            result = semfield_hierarchy.fetchone()
-
-                            if result:
-                                temp.append(Semfield(code=result[0], english=result[1], language=self.language))
-            self._hypers = temp
+            self._hypers = self._semfields(hierarchy.get().parents(self.code))
         return list(self._hypers)
 
     @property
     def hypons(self) -> List['Semfield']:
         if not self._hypons:
-            temp = []
-            try:
-                semfield_hierarchy = db("common", "semfield_hierarchy")
-
-                if semfield_hierarchy:
-                    semfield_hierarchy.execute(f'SELECT hypons FROM semfield_hierarchy WHERE english="{self._english}" AND code="{self.code}"')
-                    result = semfield_hierarchy.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    for hypon in result[0].split(' '):
-                        if hypon is not None and hypon != '':
-                            semfield_hierarchy.execute(f'SELECT code, english FROM semfield_hierarchy WHERE english="{hypon}"')  # AND code LIKE "{self.code[:3]}%"')
-                            result = semfield_hierarchy.fetchone()
-
-                            if result:
-                                temp.append(Semfield(code=result[0], english=result[1], language=self.language))
-            self._hypons = temp
+            self._hypons = self._semfields(hierarchy.get().children(self.code))
         return list(self._hypons)
 
     @property
     def normal(self) -> 'Semfield':
         if not self._normal:
-            try:
-                semfield_hierarchy = db("common", "semfield_hierarchy")
-
-                if semfield_hierarchy:
-                    semfield_hierarchy.execute(f'SELECT normal FROM semfield_hierarchy WHERE english="{self._english}" AND code="{self.code}"')
-                    result = semfield_hierarchy.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                    raise
-            else:
-                if result:
-                    semfield_hierarchy.execute(f'SELECT code, english FROM semfield_hierarchy WHERE english="{result[0]}" AND code LIKE "{self.code[:2]}%"')
-                    result = semfield_hierarchy.fetchone()
-
-                if result:
-                    self._normal = Semfield(code=result[0], english=result[1], language=self.language)
+            normal = hierarchy.get().normal(self.code)
+            if normal is not None:
+                self._normal = self._semfields([normal])[0]
         return self._normal
 
     @property
     def code(self) -> str:
         if not self._code:
-            try:
-                semfield_hierarchy = db("common", "semfield_hierarchy")
-
-                if semfield_hierarchy:
-                    semfield_hierarchy.execute(f"SELECT code FROM semfield_hierarchy WHERE english='{self._english}'")
-                    result = semfield_hierarchy.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result and result[0]:
-                    self._code = result[0]
+            codes = hierarchy.get().codes_of(self._english)
+            if codes:
+                self._code = codes[0]
         return str(self._code) if self._code else ''
 
+    def ancestors(self) -> List['Semfield']:
+        """ Every semfield above this one, nearest first """
+        return self._semfields(hierarchy.get().ancestors(self.code))
+
+    def descendants(self) -> List['Semfield']:
+        """ Every semfield below this one, nearest first """
+        return self._semfields(hierarchy.get().descendants(self.code))
+
+    def _semfields(self, codes: Iterable[int]) -> List['Semfield']:
+        semfield_hierarchy = hierarchy.get()
+        return [Semfield(code=code, english=semfield_hierarchy.english(code), language=self.language) for code in codes]
+
     @property
     def english(self) -> str:
         return str(self._english)
@@ -226,30 +182,47 @@ class Synset(object):
     def __new__(cls, id: str, language: str):
         if not (id and language):
             return
+        identity_map = cache.get(language)
+        instance = identity_map.get(('synset', id))
+        if instance is not cache.MISSING:
+            return instance
         try:
             result = None
             language_synset = db(cls.get_synset_language(id), "synset")
 
             if language_synset:
-                language_synset.execute(f"SELECT * FROM {cls.get_synset_language(id)}_synset WHERE id='{id}'")
+                language_synset.execute(sql('synset', cls.get_synset_language(id)), (id,))
                 result = language_synset.fetchone()
             if not result:
                 language_synset = db(language, "synset")
                 if language_synset:
-                    language_synset.execute(f"SELECT * FROM {language}_synset WHERE id='{id}'")
+                    language_synset.execute(sql('synset', language), (id,))
                     result = language_synset.fetchone()
             if not result:
                 english_synset = db("english", "synset")
                 if english_synset:
-                    english_synset.execute(f"SELECT * FROM english_synset WHERE id='{id}'")
+                    english_synset.execute(sql('synset', 'english'), (id,))
                     result = english_synset.fetchone()
         except OperationalError:
             raise
         else:
             instance = super().__new__(cls) if result else None
+        return identity_map.put(('synset', id), instance)
+
+    @classmethod
+    def _build(cls, id: str, language: str) -> 'Synset':
+        """ Builds (or returns the cached) synset for an id already known to exist, without verifying it """
+        identity_map = cache.get(language)
+        instance = identity_map.get(('synset', id))
+        if instance is cache.MISSING or instance is None:
+            instance = super().__new__(cls)
+            instance.__init__(id, language)
+            identity_map.put(('synset', id), instance)
         return instance
 
     def __init__(self, id, language):
+        if hasattr(self, '_id'):  # served from the identity map
+            return
         self._id = id
         self._language = language
         self._relations = None
@@ -283,7 +256,7 @@ class Synset(object):
                 common_relation = db("common", "relation")
 
                 if common_relation:
-                    common_relation.execute(f"SELECT * FROM common_relation WHERE id_source='{self.id}'")
+                    common_relation.execute(sql('relations_by_source', 'common'), (self.id,))
                     results = common_relation.fetchall()
 
                     if results:
@@ -293,7 +266,7 @@ class Synset(object):
                 language_relation = db(self.language, "relation")
 
                 if language_relation:
-                    language_relation.execute(f"SELECT * FROM {self.language}_relation WHERE id_source='{self.id}'")
+                    language_relation.execute(sql('relations_by_source', self.language), (self.id,))
                     results = language_relation.fetchall()
 
                     if results:
@@ -348,22 +321,19 @@ class Synset(object):
                 common_semfield = db("common", "semfield")
 
                 if common_semfield:
-                    common_semfield.execute(f"SELECT english FROM semfield WHERE synset='{self.id}'")
-                    result = common_semfield.fetchone()
+                    common_semfield.execute(sql('synset_semfields'), (self.id,))
+                    results = common_semfield.fetchall()
 
-                    if result:
-                        for s in result[0].split(' '):
-                            temp.append(Semfield(english=s, language=self.language))
+                    if results:
+                        for code, english in results:
+                            temp.append(Semfield(english=english, code=code, language=self.language))
                     else:
                         language_semfield = db(self.language, "semfield")
 
                         if language_semfield:
-                            language_semfield.execute(f"SELECT english FROM {self.language}_semfield WHERE synset='{self.id}'")
-                            result = language_semfield.fetchone()
-
-                            if result:
-                                for s in result[0].split(' '):
-                                    self._semfield.append(Semfield(english=s, language=self.language))
+                            language_semfield.execute(sql('synset_semfields', self.language), (self.id,))
+                            for code, english in language_semfield.fetchall():
+                                temp.append(Semfield(english=english, code=code, language=self.language))
             except OperationalError:
                 raise
             else:
@@ -372,63 +342,56 @@ class Synset(object):
 
     @property
     def lemmas(self) -> List['Lemma']:
-        if not self._word:
+        if self._word is None:
             temp = []
-            _DB_COLUMN = {
-                'n': 'id_n',
-                'v': 'id_v',
-                'a': 'id_a',
-                'r': 'id_r',
-            }
-
             try:
                 language_synset = db(self.language, "synset")
 
                 if language_synset:
-                    language_synset.execute(f"SELECT word FROM {self.language}_synset WHERE id='{self.id}'")
+                    language_synset.execute(sql('synset_word', self.language), (self.id,))
                     result = language_synset.fetchone()
 
-                    if result and result[0] and result[0] != ' GAP! ':
-                        temp = [Lemma(lemma.lower(), id=self.id[0], miscellanea=None, pos=self.pos,
-                                      language=self.language)
-                                for \
-                                lemma in result[0].strip(
-
-                        ).split(' ')]
+                    if result:
+                        temp = self._lemmas_from_word(result[0])
                 else:
                     language_index = db(self.language, "index")
 
                     if language_index:
-                        language_index.execute(f"SELECT lemma FROM {self.language}_index WHERE {_DB_COLUMN[self.pos]} LIKE '%{self.id}%';")
-                        results = language_index.fetchall()
-
-                        if results:
-                            for result in results:
-                                if result[0] != 'gap!':
-                                    temp.append(Lemma(result[0], pos=self.pos, id=self.id[0], language=self.language,
-                                                      miscellanea=None))
+                        language_index.execute(sql('membership_lemmas', self.language), (self.id,))
+                        temp = self._lemmas_from_index(result[0] for result in language_index.fetchall())
             except OperationalError:
                 raise
             else:
                 self._word = temp
         return list(self._word)
 
+    def _lemmas_from_word(self, word: str) -> List['Lemma']:
+        """ The lemmas listed in the word column of a {language}_synset row """
+        if word and word != ' GAP! ':
+            return [Lemma(lemma.lower(), id=self.id[0], miscellanea=None, pos=self.pos, language=self.language)
+                    for lemma in word.strip().split(' ')]
+        return []
+
+    def _lemmas_from_index(self, lemmas: Iterable[str]) -> List['Lemma']:
+        """ The lemmas listing this synset in {language}_index """
+        return [Lemma(lemma, pos=self.pos, id=self.id[0], language=self.language, miscellanea=None)
+                for lemma in lemmas if lemma != 'gap!']
+
     @property
     def gloss(self) -> str:
-        if not self._gloss:
+        if self._gloss is None:
             try:
                 language_synset = db(self.get_synset_language(self.id), "synset")
 
                 if language_synset:
-                    language_synset.execute(f"SELECT gloss FROM {self.get_synset_language(self.id)}_synset WHERE id='{self.id}'")
+                    language_synset.execute(sql('synset_gloss', self.get_synset_language(self.id)), (self.id,))
                     result = language_synset.fetchone()
                 else:
                     result = None
             except OperationalError:
                 raise
             else:
-                if result:
-                    self._gloss = result[0]
+                self._gloss = result[0] if result and result[0] else ''
         return str(self._gloss) if self._gloss else ''
 
     def __hash__(self):
@@ -444,10 +407,18 @@ class Synset(object):
         return f"Synset('{self.id}', '{self.get_synset_language(self.id)}')"
 
 
+    def _from_nodes(self, graph: 'graph.RelationGraph', nodes: Iterable[int]) -> List['Synset']:
+        return [self if graph.id(node) == self.id else Synset(graph.id(node), self.language) for node in nodes]
+
     @property
     def root(self):
         """Get the topmost hypernyms of this synset. """
 
+        relation_graph = graph.loaded(self.language)
+        if relation_graph is not None:
+            node = relation_graph.node(self.id)
+            return self._from_nodes(relation_graph, relation_graph.roots(node)) if node is not None else [self]
+
         result = []
         seen = set()
         todo = [self]
@@ -463,53 +434,74 @@ class Synset(object):
                     todo.extend(next_hypernyms)
         return result
 
-    def max_depth(self, path: list = None):
+    def max_depth(self) -> int:
         """
         :return: The length of the longest hypernym path from this
         synset to the root.
         """
 
-        if path is None:
-            path = []
+        relation_graph = graph.loaded(self.language)
+        if relation_graph is not None:
+            node = relation_graph.node(self.id)
+            return relation_graph.max_depths()[node] if node is not None else 0
+        return self._depths()[1]
 
-        if len(path) > 1 and self in path[1:]:
-            return 0
-        path.append(self)
-        hypernyms = [hypernymy.target for hypernymy in self.get_relations('@')]
-        if not hypernyms:
-            return 0
-        else:
-            return 1 + max(hypernym.max_depth(path) for hypernym in hypernyms)
-
-    @property
-    def min_depth(self, path: list = None):
+    def min_depth(self) -> int:
         """
         :return: The length of the shortest hypernym path from this
         synset to the root.
         """
 
-        if path is None:
-            path = []
+        relation_graph = graph.loaded(self.language)
+        if relation_graph is not None:
+            node = relation_graph.node(self.id)
+            return relation_graph.min_depths()[node] if node is not None else 0
+        return self._depths()[0]
 
-        if len(path) > 1 and self in path[1:]:
-            return 0
-        path.append(self)
-        hypernyms = [hypernymy.target for hypernymy in self.get_relations('@')]
-        if not hypernyms:
-            return 0
+    def _depths(self) -> Tuple[int, int]:
+        """ The (min, max) depth of the synset in {language}_depth, computed for every synset when the relation table
+        is compiled (reindex(language, 'relation') adds it to a database compiled earlier) """
+        try:
+            relation_language = _relation_language(self.language)
+            language_relation = db(relation_language, "relation") if relation_language else None
+
+            if language_relation:
+                language_relation.execute(sql('depth_by_synset', relation_language), (self.id,))
+                result = language_relation.fetchone()
+            else:
+                result = None
+        except OperationalError:
+            raise
         else:
-            return 1 + min(hypernym.min_depth(path) for hypernym in hypernyms)
+            return tuple(result) if result else (0, 0)
 
-    @property
     def closure(self, type: str, depth=-1):
         """Return the transitive closure of synset under the
         relationship of type 'type', breadth-first
         """
-        ids = []
-        for target in breadth_first(list(self.get_relations(type)), depth):
-            if target.id != self.id and target.id not in ids:
-                ids.append(target.id)
-                yield target
+        if type not in Relation.types[self.pos]:
+            raise ValueError(f"No relation type '{type}' for '{self.pos}'!")
+
+        relation_graph = graph.loaded(self.language)
+        if relation_graph is not None:
+            node = relation_graph.node(self.id)
+            if node is not None:
+                for target in relation_graph.closure(node, type, depth):
+                    yield Synset(relation_graph.id(target), self.language)
+            return
+
+        ids = {self.id}
+        queue = deque([(self, 0)])
+        while queue:
+            synset, distance = queue.popleft()
+            if distance == depth:
+                continue
+            for relation in synset.get_relations(type):
+                target = relation.target
+                if target is not None and target.id not in ids:
+                    ids.add(target.id)
+                    yield target
+                    queue.append((target, distance + 1))
 
     @property
     def paths_to_root(self):
@@ -520,6 +512,13 @@ class Synset(object):
         :return: A list of lists, where each list gives the node sequence
            connecting the initial ``Synset`` node and a root node.
         """
+        relation_graph = graph.loaded(self.language)
+        if relation_graph is not None:
+            node = relation_graph.node(self.id)
+            if node is None:
+                return [[self]]
+            return [self._from_nodes(relation_graph, path) for path in relation_graph.paths_to_root(node)]
+
         paths = []
 
         hypernyms = list(self.get_relations('@'))
@@ -532,19 +531,102 @@ class Synset(object):
                 paths.append(ancestor_list)
         return paths
 
+    def lowest_common_hypernyms(self, other: 'Synset') -> List['Synset']:
+        """
+        The deepest hypernyms (by max depth) this synset shares with other, counting each synset as its own
+        hypernym; see WordNet.lowest_common_hypernyms().
+        """
+        return WordNet(self.language).lowest_common_hypernyms([(self, other)])[0]
+
+    def path_similarity(self, other: 'Synset') -> float:
+        """
+        1 / (1 + the length of the shortest hypernym path between the two synsets), or None if they share no
+        hypernym.
+        """
+        return self._similarity(other, 'path')
+
+    def lch_similarity(self, other: 'Synset') -> float:
+        """
+        Leacock-Chodorow similarity, -log((shortest path length + 1) / (2 * the deepest hypernym path of their
+        part of speech)), or None if they share no hypernym. Both synsets must have the same part of speech.
+        """
+        return self._similarity(other, 'lch')
+
+    def wup_similarity(self, other: 'Synset') -> float:
+        """
+        Wu-Palmer similarity, from the depth of the two synsets' lowest common hypernym and their distances to it,
+        or None if they share no hypernym.
+        """
+        return self._similarity(other, 'wup')
+
+    def _similarity(self, other: 'Synset', metric: str) -> float:
+        """ Scores two synsets with the relation graph of the language (loaded on first use) """
+        if metric == 'lch' and self.pos != other.pos:
+            raise ValueError(f"cannot compute lch similarity between '{self.pos}' and '{other.pos}' synsets")
+        relation_graph = graph.loaded(self.language)
+        if relation_graph is None:
+            relation_graph = graph.load(self.language)
+        return relation_graph.similarity_of(self.id, other.id, metric)
+
 
 class Morpho(object):
     """ Represents morphological information for a Lemma in the WordNet """
+
+    # The columns of {language}_morpho, in order
+    COLUMNS = {
+        'latin': ('id', 'lemma', 'pos', 'principal_parts', 'irregular_forms', 'alternative_forms', 'pronunciation',
+                  'miscellanea'),
+        'hebrew': ('id', 'lemma', 'pos', 'irregular_forms', 'pronunciation', 'undotted', 'dotted_without_dots',
+                   'variants', 'translit_dotted', 'translit_undotted', 'miscellanea'),
+    }
+
+    FIELDS = ('id', 'lemma', 'pos', 'principal_parts', 'irregular_forms', 'alternative_forms', 'pronunciation',
+              'undotted', 'dotted_without_dots', 'variants', 'translit_dotted', 'translit_undotted', 'miscellanea')
+
+    __slots__ = ('_language', '_loaded') + tuple(f'_{field}' for field in FIELDS)
+
     def __init__(self, fields, language):
-        if language == 'hebrew':
-            self._id, self._lemma, self._pos, self._principal_parts, self._irregular_forms, \
-            self._alternative_forms, self._pronunciation, self._undotted, self._dotted_without_dots, \
-            self._variants, self._translit_dotted, self._translit_undotted, self._miscellanea = fields
-            self._language = language
-        elif language == 'latin':
-            self._id, self._lemma, self._pos, self._principal_parts, self._irregular_forms, \
-            self._alternative_forms, self._pronunciation, self._miscellanea = fields
-            self._language = language
+        self._language = language
+        for field in self.FIELDS:
+            setattr(self, f'_{field}', None)
+        for column, value in zip(self.COLUMNS.get(language, ()), fields):
+            setattr(self, f'_{column}', value)
+        self._loaded = len(fields) == len(self.COLUMNS.get(language, ()))
+
+    @classmethod
+    def of(cls, lemma: str, pos: str, language: str, id=None) -> 'Morpho':
+        """Loads the morpho row of a lemma (by id if given, else the first row for lemma and pos), or None."""
+        conditions = {'id=?': id} if id else {'lemma=?': lemma, 'pos=?': pos}
+        try:
+            language_morpho = db(language, "morpho")
+
+            if language_morpho:
+                language_morpho.execute(sql('morpho', language, where=where(conditions)), tuple(conditions.values()))
+                result = language_morpho.fetchone()
+            else:
+                result = None
+        except OperationalError:
+            raise
+        else:
+            return cls(result, language) if result else None
+
+    def _field(self, name: str):
+        """ The value of a column, reading the rest of the row (once) if the Morpho was built from part of it """
+        value = getattr(self, f'_{name}')
+        if not value and not self._loaded:
+            self._loaded = True
+            loaded = Morpho.of(self._lemma, self._pos, self.language, id=self._id)
+            if loaded:
+                for field in self.FIELDS:
+                    if not getattr(self, f'_{field}'):
+                        setattr(self, f'_{field}', getattr(loaded, f'_{field}'))
+            value = getattr(self, f'_{name}')
+        return value
+
+    @property
+    def tag(self) -> MorphoTag:
+        """The features of the morphological tag, decoded once."""
+        return decode(self.miscellanea)
 
     @property
     def language(self) -> str:
@@ -603,191 +685,75 @@ class Morpho(object):
             _lemma = self._lemma
         return _lemma
 
+    def paradigm(self) -> List[Tuple[str, str]]:
+        """
+        Returns the full declension or conjugation of a Latin lemma as (form, miscellanea) pairs, generated from its
+        principal parts, group, gender, voice, irregular and alternative forms (see multiwordnet.inflection).
+        """
+        if self.language != 'latin':
+            return []
+        return inflect(self.lemma, self.pos, self.principal_parts, self.irregular_forms,
+                       self.alternative_forms, self.miscellanea)
+
     @property
     def id(self) -> str:
-        if not self._id:
-            try:
-                language_morpho = db(self.language, "morpho")
-
-                if language_morpho:
-                    language_morpho.execute(f"SELECT id FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                    result = language_morpho.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    self._id = result[0]
-        return str(self._id) if self._id else ''
+        id = self._field('id')
+        return str(id) if id else ''
 
     @property
     def irregular_forms(self) -> dict:
-        if not self._irregular_forms:
-            try:
-                language_morpho = db(self.language, "morpho")
-
-                if language_morpho:
-                    language_morpho.execute(f"SELECT irregular_forms FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                    result = language_morpho.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result and result[0]:
-                    self._irregular_forms = result[0]
-        return [tuple(irregular_form.split('=')) for irregular_form in self._irregular_forms.strip().split(' ')] if self._irregular_forms else []
+        irregular_forms = self._field('irregular_forms')
+        return [tuple(irregular_form.split('=')) for irregular_form in irregular_forms.strip().split(' ')] if irregular_forms else []
 
     @property
     def alternative_forms(self) -> dict:
-        if not self._alternative_forms:
-            try:
-                language_morpho = db(self.language, "morpho")
-
-                if language_morpho:
-                    language_morpho.execute(f"SELECT alternative_forms FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                    result = language_morpho.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result and result[0]:
-                    self._alternative_forms = result[0]
-        return [tuple(alternative_form.split('=')) for alternative_form in self._alternative_forms.strip().split(' ')] if self._alternative_forms else []
+        alternative_forms = self._field('alternative_forms')
+        return [tuple(alternative_form.split('=')) for alternative_form in alternative_forms.strip().split(' ')] if alternative_forms else []
 
     @property
     def principal_parts(self) -> List[str]:
-        if not self._principal_parts:
-            try:
-                language_morpho = db(self.language, "morpho")
-
-                if language_morpho:
-                    language_morpho.execute(f"SELECT principal_parts FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                    result = language_morpho.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result and result[0]:
-                    self._principal_parts = result[0]
-        return self._principal_parts.strip().split(' ') if self._principal_parts else []
+        principal_parts = self._field('principal_parts')
+        return principal_parts.strip().split(' ') if principal_parts else []
 
     @property
     def pronunciation(self) -> str:
-        if not self._pronunciation:
-            try:
-                language_morpho = db(self.language, "morpho")
-
-                if language_morpho:
-                    language_morpho.execute(f"SELECT pronunciation FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                    result = language_morpho.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    self._pronunciation = result[0]
-        return str(self._pronunciation) if self._pronunciation else ''
+        pronunciation = self._field('pronunciation')
+        return str(pronunciation) if pronunciation else ''
 
     @property
     def undotted(self) -> str:
-        if self.language == 'hebrew' and not self._undotted:
-            try:
-                language_morpho = db(self.language, "morpho")
-                language_morpho.execute(f"SELECT undotted FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                result = language_morpho.fetchone()
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    self._undotted = result[0]
-        return str(self._undotted) if self._undotted else ''
+        undotted = self._field('undotted') if self.language == 'hebrew' else None
+        return str(undotted) if undotted else ''
 
     @property
     def dotted_without_dots(self) -> str:
-        if self.language == 'hebrew' and not self._dotted_without_dots:
-            try:
-                language_morpho = db(self.language, "morpho")
-                language_morpho.execute(f"SELECT dotted_without_dots FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                result = language_morpho.fetchone()
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    self._dotted_without_dots = result[0]
-        return str(self._dotted_without_dots) if self._dotted_without_dots else ''
+        dotted_without_dots = self._field('dotted_without_dots') if self.language == 'hebrew' else None
+        return str(dotted_without_dots) if dotted_without_dots else ''
 
     @property
     def variants(self) -> str:
-        if self.language == 'hebrew' and not self._variants:
-            try:
-                language_morpho = db(self.language, "morpho")
-                language_morpho.execute(f"SELECT variants FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                result = language_morpho.fetchone()
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    self._variants = result[0]
-        return str(self._variants) if self._variants else ''
+        variants = self._field('variants') if self.language == 'hebrew' else None
+        return str(variants) if variants else ''
 
     @property
     def translit_dotted(self) -> str:
-        if self.language == 'hebrew' and not self._translit_dotted:
-            try:
-                language_morpho = db(self.language, "morpho")
-                language_morpho.execute(f"SELECT translit_dotted FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                result = language_morpho.fetchone()
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    self._translit_dotted = result[0]
-        return str(self._translit_dotted) if self._translit_dotted else ''
+        translit_dotted = self._field('translit_dotted') if self.language == 'hebrew' else None
+        return str(translit_dotted) if translit_dotted else ''
 
     @property
     def translit_undotted(self) -> str:
-        if self.language == 'hebrew' and not self._translit_undotted:
-            try:
-                language_morpho = db(self.language, "morpho")
-                language_morpho.execute(f"SELECT translit_undotted FROM {self.language}_morpho WHERE lemma='{self.lemma}' and pos='{self.pos}';")
-                result = language_morpho.fetchone()
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    self._translit_undotted = result[0]
-        return str(self._translit_undotted) if self._translit_undotted else ''
+        translit_undotted = self._field('translit_undotted') if self.language == 'hebrew' else None
+        return str(translit_undotted) if translit_undotted else ''
 
     @property
     def miscellanea(self) -> str:
-        if not self._miscellanea:
-            temp = ''
-            try:
-                language_morpho = db(self.language, "morpho")
-
-                if language_morpho:
-                    language_morpho.execute(f"SELECT miscellanea FROM {self._language}_morpho WHERE lemma='{self._lemma}' and pos='{self._pos}';")
-                    result = language_morpho.fetchone()
-                else:
-                    result = None
-            except OperationalError:
-                raise
-            else:
-                if result:
-                    temp = result[0]
-            self._miscellanea = temp
-        return str(self._miscellanea)
+        miscellanea = self._field('miscellanea')
+        return str(miscellanea) if miscellanea else ''
 
     @property
     def pos(self) -> str:
         if not self._pos:
-            groups = re.search(r'^([nvarpusct])[\S][\S][\S][\S][\S][\S][\S][\S][\S]$', self.miscellanea)
-            self._pos = groups.group(1) if groups else ''
+            self._pos = self.tag.pos
         return str(self._pos) if self._pos else ''
 
     @property
@@ -809,8 +775,7 @@ class Morpho(object):
     def person(self) -> str:
         if self.pos != 'v':
             return None
-        groups = re.search(r'^[\S]([123])[\S][\S][\S][\S][\S][\S][\S][\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.person
 
     @property
     def person_verbose(self) -> str:
@@ -827,8 +792,7 @@ class Morpho(object):
     def degree(self) -> str:
         if self.pos not in ['a', 'r']:
             return None
-        groups = re.search(r'^[\S]([pcs])[\S][\S][\S][\S][\S][\S][\S][\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.degree
 
     @property
     def degree_verbose(self) -> str:
@@ -843,8 +807,7 @@ class Morpho(object):
 
     @property
     def number(self) -> str:
-        groups = re.search(r'^[\S][\S]([sp])[\S][\S][\S][\S][\S][\S][\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.number
 
     @property
     def number_verbose(self) -> str:
@@ -857,8 +820,7 @@ class Morpho(object):
 
     @property
     def tense(self) -> str:
-        groups = re.search(r'^[\S][\S][\S]([pfirlt])[\S][\S][\S][\S][\S][\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.tense
 
     @property
     def tense_verbose(self) -> str:
@@ -874,8 +836,7 @@ class Morpho(object):
 
     @property
     def mood(self) -> str:
-        groups = re.search(r'^[\S][\S][\S][\S]([nimspgd])[\S][\S][\S][\S][\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.mood
 
     @property
     def mood_verbose(self) -> str:
@@ -892,8 +853,7 @@ class Morpho(object):
 
     @property
     def voice(self) -> str:
-        groups = re.search(r'^[\S][\S][\S][\S][\S]([apmds])[\S][\S][\S][\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.voice
 
     @property
     def voice_verbose(self) -> str:
@@ -908,8 +868,7 @@ class Morpho(object):
 
     @property
     def gender(self) -> str:
-        groups = re.search(r'^[\S][\S][\S][\S][\S][\S]([mfnca])[\S][\S][\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.gender
 
     @property
     def gender_verbose(self) -> str:
@@ -924,8 +883,7 @@ class Morpho(object):
 
     @property
     def case(self) -> str:
-        groups = re.search(r'^[\S][\S][\S][\S][\S][\S][\S]([ngdabvl])[\S][\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.case
 
     @property
     def case_verbose(self) -> str:
@@ -942,13 +900,11 @@ class Morpho(object):
 
     @property
     def group(self) -> str:
-        groups = re.search(r'^[\S][\S][\S][\S][\S][\S][\S][\S]([\d-])[\S]$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.group
 
     @property
     def stem(self) -> str:
-        groups = re.search(r'^[\S][\S][\S][\S][\S][\S][\S][\S][\S]([\w-])$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.stem
 
     @property
     def group_verbose(self) -> str:
@@ -976,13 +932,11 @@ class Morpho(object):
 
     @property
     def is_istem(self) -> bool:
-        groups = re.search(r'^[\S][\S][\S][\S][\S][\S][\S][\S][\S]([i])$', self.miscellanea)
-        return bool(groups)
+        return self.tag.is_istem
 
     @property
     def istem(self) -> str:
-        groups = re.search(r'^[\S][\S][\S][\S][\S][\S][\S][\S][\S]([i-])$', self.miscellanea)
-        return groups.group(1) if groups else ''
+        return self.tag.istem
 
     def __repr__(self):
         return f"Morpho('{self.lemma}', '{self.pos}')"
@@ -1003,23 +957,21 @@ class Lemma(object):
     """
 
     def __new__(cls, lemma, pos, miscellanea=None, id=None, language='english'):
-        if "''" in lemma:
-            pass
-        elif "'" in lemma:
-            lemma = lemma.replace("'", "''")
         if ' ' in lemma:
             lemma = lemma.replace(' ', '_')
+        identity_map = cache.get(language)
+        key = ('lemma', lemma, pos, miscellanea, id)
+        instance = identity_map.get(key)
+        if instance is not cache.MISSING:
+            return instance
         if language == 'latin':
-            mquery = f"miscellanea='{miscellanea}'" if miscellanea else ''
-            iquery = f"id='{id}'" if id else ''
-            pquery = f"pos='{pos}'" if pos in 'nvar' else ""
-            query = ' AND '.join(filter(None, [iquery, pquery, mquery]))
-            if query: query = ' AND ' + query
+            conditions = {'lemma=?': lemma, 'id=?': id, 'pos=?': pos if pos in 'nvar' else None, 'miscellanea=?': miscellanea}
+            conditions = {condition: value for condition, value in conditions.items() if value}
             try:
                 language_morpho = db(language, "morpho")
 
                 if language_morpho:
-                    language_morpho.execute(f"SELECT * FROM {language}_morpho WHERE lemma='{lemma}'{query};")
+                    language_morpho.execute(sql('morpho', language, where=where(conditions)), tuple(conditions.values()))
                     results = language_morpho.fetchall()
                 else:
                     results = None
@@ -1032,13 +984,9 @@ class Lemma(object):
                         raise ValueError(f"cannot disambiguate {lemma} between {ambig}; use get() instead")
                     else:
                         result = results[0]
-                        instance = super().__new__(cls)
-                        instance._lemma = result[1]
-                        instance._pos = result[2]
-                        instance._morpho = Morpho(result, language=language)
+                        return cls._build(key, language, result[1], result[2], morpho=result)
                 else:
-                    instance = None
-                return instance
+                    return identity_map.put(key, None)
         else:
             db_column = {
             'n': 'id_n',
@@ -1050,7 +998,7 @@ class Lemma(object):
             try:
                 language_index = db(language, "index")
                 if language_index:
-                    language_index.execute(f'SELECT {db_column[pos]} FROM {language}_index WHERE lemma="{lemma}"')
+                    language_index.execute(sql('index_by_lemma', language, columns=db_column[pos]), (lemma,))
                     result = language_index.fetchone()
                 else:
                     result = None
@@ -1058,28 +1006,36 @@ class Lemma(object):
                 raise
             else:
                 if not result or (pos in ('n', 'v', 'a', 'r') and not result[0]):
-                    instance = None
+                    return identity_map.put(key, None)
                 else:
                     if pos == '*':
-                        resolved_pos = ''
-                        if result[0]:
-                            resolved_pos += 'n'
-                        if result[1]:
-                            resolved_pos += 'v'
-                        if result[2]:
-                            resolved_pos += 'a'
-                        if result[3]:
-                            resolved_pos += 'r'
+                        resolved_pos = cls._index_pos(result)
                         if len(resolved_pos) > 1:
                             raise POSError(f"cannot disambiguate '{lemma}' between '{', '.join(resolved_pos)}'")
                         else:
                             pos = resolved_pos
-                    instance = super().__new__(cls)
-                    instance._lemma = lemma
-                    instance._pos = pos
-                return instance
+                    return cls._build(key, language, lemma, pos)
+
+    @classmethod
+    def _build(cls, key: tuple, language: str, lemma: str, pos: str, morpho: tuple = None) -> 'Lemma':
+        """ Builds a lemma already known to exist, from its resolved pos (and morpho row), and caches it under key """
+        instance = super().__new__(cls)
+        instance._lemma = lemma
+        instance._pos = pos
+        if morpho is not None:
+            instance._morpho = Morpho(morpho, language=language)
+        _, lemma, pos, miscellanea, id = key
+        instance.__init__(lemma, pos, miscellanea, id, language)
+        return cache.get(language).put(key, instance)
+
+    @staticmethod
+    def _index_pos(columns: tuple) -> str:
+        """ The parts of speech ('nvar') for which the id_n, id_v, id_a and id_r columns of an index row list synsets """
+        return ''.join(pos for pos, synsets in zip('nvar', columns) if synsets)
 
     def __init__(self, lemma, pos, miscellanea, id, language):
+        if hasattr(self, '_language'):  # served from the identity map
+            return
         if pos != '*' and pos is not None:
             self._pos = pos
         self._lemma = lemma
@@ -1090,42 +1046,29 @@ class Lemma(object):
 
     @property
     def morpho(self) -> Morpho:
-        if not self._morpho:
-            self._morpho = Morpho(self.lemma, self.pos, self.language)
-        return self._morpho or None
+        if getattr(self, '_morpho', None) is None:
+            self._morpho = Morpho.of(self.lemma, self.pos, self.language)
+        return self._morpho
 
     @property
     def synsets(self) -> List['Synset']:
         if not self._synsets:
             temp = list()
-            _DB_COLUMN = {
-                    'n': 'id_n',
-                    'v': 'id_v',
-                    'a': 'id_a',
-                    'r': 'id_r',
-                    '*': 'id_n, id_v, id_a, id_r',
-                }
             try:
                 language_index = db(self.language, "index")
 
                 if language_index:
-                    language_index.execute(f"SELECT {_DB_COLUMN[self.pos]} FROM {self.language}_index WHERE lemma='{self.lemma}'")
-                    result = language_index.fetchone()
+                    if self.pos == '*':
+                        language_index.execute(sql('membership_synsets_by_lemma', self.language), (self.lemma,))
+                        results = language_index.fetchall()
 
-                    if result:
-                        if self.pos == '*':
-                            if not result[0]:  # n
-                                if not result[1]:  # v
-                                    if not result[2]:  # a
-                                        temp = [Synset(syn, self.language) for syn in result[3].split(' ') if syn]  # r
-                                    else:
-                                        temp = [Synset(syn, self.language) for syn in result[2].split(' ') if syn]
-                                else:
-                                    temp = [Synset(syn, self.language) for syn in result[1].split(' ') if syn]
-                            else:
-                                temp = [Synset(syn, self.language) for syn in result[0].split(' ') if syn]
-                        elif result[0]:
-                            temp = [Synset(syn, self.language) for syn in result[0].split(' ') if syn]
+                        if results:
+                            # the synsets of the first part of speech, in the order n, v, a, r
+                            pos = min((result[0] for result in results), key='nvar'.index)
+                            temp = [Synset(result[1], self.language) for result in results if result[0] == pos]
+                    else:
+                        language_index.execute(sql('membership_synsets', self.language), (self.lemma, self.pos))
+                        temp = [Synset(result[0], self.language) for result in language_index.fetchall()]
             except OperationalError:
                 raise
             else:
@@ -1141,7 +1084,7 @@ class Lemma(object):
 
                 if language_synonyms:
                     for synset in self.synsets:
-                        language_synonyms.execute(f"SELECT lemma FROM {self.language}_synonyms WHERE pos='{self.pos}' AND syn='{synset.offset}'")
+                        language_synonyms.execute(sql('synonyms', self.language), (self.pos, synset.offset))
                         results = language_synonyms.fetchall()
                         if results:
                             for result in results:
@@ -1154,7 +1097,7 @@ class Lemma(object):
 
                     if language_synset:
                         for synset in self.synsets:
-                            language_synset.execute(f"SELECT word, phrase FROM {self.language}_synset WHERE id='{synset.id}'")
+                            language_synset.execute(sql('synset_word_and_phrase', self.language), (synset.id,))
                             result = language_synset.fetchone()
                             if result[0]:
                                 for word in result[0].strip().split(' '):
@@ -1203,7 +1146,7 @@ class Lemma(object):
         _derived_words = []
         try:
             language_relation = db(self.language, "relation")
-            language_relation.execute(f"SELECT id_source, w_source FROM {self.language}_relation WHERE w_target='{self.lemma}' AND type='\\';")
+            language_relation.execute(sql('lexical_sources', self.language), (self.lemma, '\\'))
             results = language_relation.fetchall()
         except OperationalError:
             raise
@@ -1225,7 +1168,7 @@ class Lemma(object):
         _related_words = []
         try:
             language_relation = db(self.language, "relation")
-            language_relation.execute(f"SELECT id_target, w_target FROM {self.language}_relation WHERE w_source='{self.lemma}' AND type='/';")
+            language_relation.execute(sql('lexical_targets', self.language), (self.lemma, '/'))
             results = language_relation.fetchall()
         except OperationalError:
             raise
@@ -1245,7 +1188,7 @@ class Lemma(object):
         try:
             language_relation = db(self.language, "relation")
             if language_relation:
-                language_relation.execute(f"SELECT id_target, w_target FROM {self.language}_relation WHERE w_source='{self.lemma}' AND type='!';")
+                language_relation.execute(sql('lexical_targets', self.language), (self.lemma, '!'))
                 results = language_relation.fetchall()
             else:
                 results = None
@@ -1270,9 +1213,7 @@ class Lemma(object):
         try:
             language_relation = db(self.language, "relation")
             if language_relation:
-                language_relation.execute(
-                    f"SELECT id_target, w_target FROM {self.language}_relation WHERE w_source='{self.lemma}' AND "
-                    f"type='-c';")
+                language_relation.execute(sql('lexical_targets', self.language), (self.lemma, '-c'))
                 results = language_relation.fetchall()
             else:
                 results = None
@@ -1297,9 +1238,7 @@ class Lemma(object):
         try:
             language_relation = db(self.language, "relation")
             if language_relation:
-                language_relation.execute(
-                    f"SELECT id_target, w_target FROM {self.language}_relation WHERE w_source='{self.lemma}' AND "
-                    f"type='+c';")
+                language_relation.execute(sql('lexical_targets', self.language), (self.lemma, '+c'))
                 results = language_relation.fetchall()
             else:
                 results = None
@@ -1481,22 +1420,189 @@ class WordNet(object):
     _lemmas: A list of Lemma objects representing distinct lemmas within the WordNet.
     _synsets: A list of Synset objects representing the synsets defined for the WordNet.
     _semfields: A list of all semfields defined for the MultiWordNet.
+    _retain: Whether synsets, lemmas and relations keep every object they yield once fully iterated (by default
+        they stream from the database cursor and keep nothing but what the identity map holds).
     """
 
-    def __init__(self, language: str='english'): # iso 639-3
+    def __init__(self, language: str='english', retain: bool=False): # iso 639-3
         self._language = language
+        self._retain = retain
         self._relations = None
         self._lemmas = None
         self._synsets = None
         self._semfields = None
+        self._cache = cache.get(language)
 
     @property
-    def cache(self):
+    def cache(self) -> 'cache.IdentityMap':
+        """
+        The identity map of the Synsets and Lemmas of this WordNet's language (see IdentityMap.info()). It is
+        shared by every WordNet of the language in the process, and emptied when the language is recompiled.
+        """
         return self._cache
 
+    @property
+    def graph(self) -> 'graph.RelationGraph':
+        """The in-memory relation graph of this WordNet, if load_graph() has been called."""
+        return graph.loaded(self.language)
+
+    def load_graph(self) -> 'graph.RelationGraph':
+        """
+        Loads the common relations and the relations of this WordNet's language into memory, once. Afterwards
+        the hypernym traversals of its synsets (root, max_depth, min_depth, closure, paths_to_root) run against
+        the in-memory graph instead of querying the relation databases at every step.
+        """
+        return graph.load(self.language)
+
     def get_synset(self, id: str) -> Synset:
         return Synset(id, self.language)
 
+    def get_synsets_by_ids(self, ids: Iterable[str]) -> List[Synset]:
+        """
+        Resolves many synset ids at once, with one IN (...) query per backing database and chunk of ids rather
+        than up to three queries per id. The synsets are looked up where Synset(id, language) would look for them
+        (the database of the language that defined them, then this WordNet's, then English) and come back with
+        their lemmas and gloss already loaded.
+
+        :param ids: Synset ids, e.g. from {language}_index rows or relation targets.
+        :return: A list in the order of ids, with None for the ids that do not exist.
+        """
+        ids = list(ids)
+        rows = {}  # id -> its row in the first database that has it, as Synset.__new__ would find it
+        glosses = {}  # id -> its gloss in the database of the language that defined it
+        words = {}  # id -> its word column in this WordNet's synset database
+        members = {}  # id -> its lemmas in {language}_index, when this WordNet has no synset database
+
+        def fetch(language, pending):
+            language_synset = db(language, "synset")
+            if not language_synset:
+                return {}
+            found = {}
+            for chunk in chunks(pending):
+                language_synset.execute(sql('synsets_by_ids', language, parameters=parameters(len(chunk))), chunk)
+                for result in language_synset:
+                    found[result[0]] = result
+            return found
+
+        try:
+            pending = {}
+            for id in dict.fromkeys(id for id in ids if id):
+                pending.setdefault(Synset.get_synset_language(id), []).append(id)
+            for synset_language, language_ids in pending.items():
+                found = fetch(synset_language, language_ids)
+                rows.update(found)
+                glosses.update((id, result[3]) for id, result in found.items())
+                if synset_language == self.language:
+                    words.update((id, result[1]) for id, result in found.items())
+
+            for fallback in (self.language, 'english'):
+                missing = [id for language_ids in pending.values() for id in language_ids if id not in rows]
+                if missing:
+                    found = fetch(fallback, missing)
+                    rows.update(found)
+                    if fallback == self.language:
+                        words.update((id, result[1]) for id, result in found.items())
+
+            has_words = db(self.language, "synset") is not None
+            if has_words:
+                unread = [id for id in rows if id not in words]
+                words.update((id, result[1]) for id, result in fetch(self.language, unread).items())
+            else:
+                language_index = db(self.language, "index")
+                if language_index:
+                    for chunk in chunks(rows):
+                        language_index.execute(sql('membership_lemmas_by_synsets', self.language, parameters=parameters(len(chunk))), chunk)
+                        for synset, lemma in language_index:
+                            members.setdefault(synset, []).append(lemma)
+        except OperationalError:
+            raise
+        else:
+            identity_map = cache.get(self.language)
+            synsets = {}
+            for id in rows:
+                synset = synsets[id] = Synset._build(id, self.language)
+                if synset._gloss is None:
+                    synset._gloss = glosses.get(id) or ''
+                if synset._word is None:
+                    synset._word = synset._lemmas_from_word(words.get(id)) if has_words \
+                        else synset._lemmas_from_index(members.get(id, []))
+            for language_ids in pending.values():
+                for id in language_ids:
+                    if id not in rows:
+                        identity_map.put(('synset', id), None)
+            return [synsets.get(id) for id in ids]
+
+    def search_glosses(self, query: str, pos: str = None, limit: int = 10, syntax: bool = False) -> List[Synset]:
+        """
+        Returns the synsets whose gloss matches a query, e.g. search_glosses('fiume Toscana'). The glosses searched
+        are those of this WordNet's synset database and, for the synsets it shares with English, those of the
+        English one. Matching ignores case and diacritics.
+
+        The matches of this WordNet's own glosses come first, best first (by bm25), then those of the English
+        glosses of the synsets it has not matched already, best first among themselves: the bm25 ranks of two
+        separate indexes are not comparable. Each synset comes back once.
+
+        The search runs on {language}_gloss, the FTS5 index built when the synset table is compiled
+        (reindex(language, 'synset') adds it to a database compiled earlier).
+
+        :param query: Words that must all appear in the gloss, or an FTS5 query if syntax is True.
+        :param pos: The parts of speech to restrict the synsets to, as 'nvar'.
+        :param limit: The number of synsets to return (None for all).
+        """
+        if not syntax:
+            query = ' '.join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+        if not query:
+            return []
+        accepted = list(dict.fromkeys(pos)) if pos else []
+        pos_condition = f" AND pos IN ({parameters(len(accepted))})" if accepted else ''
+
+        matches = {}  # id -> (gloss, the language of the database the gloss comes from), in order
+        try:
+            for gloss_language in dict.fromkeys((self.language, 'english')):
+                language_synset = db(gloss_language, "synset")
+                if not language_synset or (limit is not None and len(matches) >= limit):
+                    continue
+                shared = gloss_language != self.language
+                language_synset.execute(sql('glosses_by_match', gloss_language, pos=pos_condition),
+                                        (query, *accepted, -1 if shared or limit is None else limit))
+                if not shared:
+                    for id, gloss, rank in language_synset:
+                        matches.setdefault(id, (gloss, gloss_language))
+                    continue
+                # keep the English glosses of the other synsets this WordNet has, reading the matches a chunk at a time
+                for chunk in chunks(language_synset):
+                    chunk = [(id, gloss) for id, gloss, rank in chunk if id not in matches]
+                    ids = self._synset_ids([id for id, gloss in chunk])
+                    for id, gloss in chunk:
+                        if id in ids and (limit is None or len(matches) < limit):
+                            matches.setdefault(id, (gloss, gloss_language))
+                    if limit is not None and len(matches) >= limit:
+                        break
+        except OperationalError:
+            raise
+        else:
+            synsets = []
+            for id, (gloss, gloss_language) in matches.items():
+                synset = Synset._build(id, self.language)
+                if synset._gloss is None and Synset.get_synset_language(id) == gloss_language:
+                    synset._gloss = gloss
+                synsets.append(synset)
+            return synsets
+
+    def _synset_ids(self, ids: List[str]) -> set:
+        """ The ids, among ids, of the synsets this WordNet lists (in its synset database, else in its index) """
+        found = set()
+        language_synset = db(self.language, "synset")
+        language_index = None if language_synset else db(self.language, "index")
+        for chunk in chunks(ids):
+            if language_synset:
+                language_synset.execute(sql('synset_ids_by_ids', self.language, parameters=parameters(len(chunk))), chunk)
+                found.update(result[0] for result in language_synset)
+            elif language_index:
+                language_index.execute(sql('membership_lemmas_by_synsets', self.language, parameters=parameters(len(chunk))), chunk)
+                found.update(result[0] for result in language_index)
+        return found
+
     @property
     def index(self):
         for lemma in self.lemmas:
@@ -1508,86 +1614,134 @@ class WordNet(object):
 
     @property
     def synsets(self) -> Generator['Synset', None, Iterable['Synset']]:
-        if not self._synsets:
-            temp = []
-            try:
-                language_synset = db(self.language, "synset")
-
-                if language_synset:
-                    language_synset.execute(f"SELECT * FROM {self.language}_synset")
-                    results = language_synset.fetchall()
-                else:
-                    results = None
-            except OperationalError:
-                raise
-            else:
-                if results:
-                    for result in results:
-                        synset = Synset(result[0], self.language)
-                        temp.append(synset)
-                        yield synset
-            self._synsets = temp
-        return iter(self._synsets)
+        yield from self.get_synsets()
 
     def get_synsets(self, pos: str = 'nvar') -> Generator['Synset', None, Iterable['Synset']]:
-        if not self._synsets:
-            temp = []
-            try:
-                language_synset = db(self.language, "synset")
+        """ Streams the synsets of the WordNet (restricted to a part of speech), built from the rows as they are read """
+        if self._synsets is not None:
+            yield from (synset for synset in self._synsets if pos == 'nvar' or synset.id.startswith(pos))
+            return
+        temp = [] if self._retain and pos == 'nvar' else None
+        try:
+            language_synset = db(self.language, "synset")
 
-                if language_synset:
-                    pos_query = '' if pos == 'nvar' else f" WHERE id LIKE '{pos}%'"
-                    language_synset.execute(f"SELECT * FROM {self.language}_synset{pos_query}")
-                    results = language_synset.fetchall()
+            if language_synset:
+                if pos == 'nvar':
+                    language_synset.execute(sql('synsets', self.language))
                 else:
-                    results = None
-            except OperationalError:
-                raise
-            else:
-                if results:
-                    for result in results:
-                        synset = Synset(result[0], self.language)
+                    language_synset.execute(sql('synsets_by_pos', self.language), (f'{pos}%',))
+        except OperationalError:
+            raise
+        else:
+            if language_synset:
+                for result in language_synset:
+                    synset = Synset._build(result[0], self.language)
+                    if temp is not None:
                         temp.append(synset)
-                        yield synset
-            self._synsets = temp
-        return iter(self._synsets)
-
+                    yield synset
+                if temp is not None:
+                    self._synsets = temp
 
     @lru_cache(maxsize=2048)
     def get_lemma(self, lemma, pos='*', miscellanea=None) -> Lemma:
         return Lemma(lemma=lemma, pos=pos, language=self.language, miscellanea=miscellanea, id=None)
 
-    @lru_cache(maxsize=2048)
-    def get(self, lemma, pos='*', miscellanea=None, mode=None) -> List[Lemma]:
-        lquery = pquery = mquery = ''
-        if lemma:
-            lemma = lemma.replace(' ', '_')
-            if "''" in lemma:
-                pass
-            elif "'" in lemma:
-                lemma = lemma.replace("'", "''")
-            if mode:
-                if mode == 'endswith':
-                    lquery = f"lemma LIKE '%{lemma}'"
-                elif mode == 'startswith':
-                    lquery = f"lemma LIKE '{lemma}%'"
-                else:
-                    lquery = f"lemma LIKE '%{lemma}%'"
+    def lookup_many(self, items: Iterable[Tuple[str, str]], chunk_size: int = CHUNK_SIZE) -> Generator[Lookup, None, None]:
+        """
+        Looks up many (lemma, pos) pairs (or bare lemmas, for pos '*'), e.g. the tokens of a lemmatised corpus,
+        as get_lemma() would, but with one IN (...) query per chunk of distinct lemmas not yet known. Results
+        stream back in the order of items; an ambiguous or missing entry is reported in its Lookup instead
+        of raising.
+        """
+        items = iter(items)
+        identity_map = self.cache
+        resolved = {}  # (lemma, pos) -> Lookup, for the duration of the call
+        while True:
+            window = [(item, '*') if isinstance(item, str) else tuple(item) for item in islice(items, chunk_size)]
+            if not window:
+                return
+            pending = {}
+            for lemma, pos in window:
+                key = (lemma.replace(' ', '_'), pos)
+                if key not in resolved and key not in pending:
+                    instance = identity_map.get(('lemma', key[0], pos, None, None))
+                    if instance is cache.MISSING:
+                        pending[key] = None
+                    else:
+                        resolved[key] = Lookup(key[0], pos, 'found' if instance else 'missing', instance)
+            if pending:
+                resolved.update(self._lookup_chunk(list(pending)))
+            for lemma, pos in window:
+                yield resolved[(lemma.replace(' ', '_'), pos)]
+
+    def _lookup_chunk(self, keys: List[Tuple[str, str]]) -> dict:
+        """ Resolves (lemma, pos) keys with one query for all their lemmas, as Lemma.__new__ would one by one """
+        rows = {}
+        try:
+            lemmas = list(dict.fromkeys(lemma for lemma, pos in keys))
+            if self.language == 'latin':
+                language_morpho = db(self.language, "morpho")
+                if language_morpho:
+                    language_morpho.execute(sql('morpho_by_lemmas', self.language, parameters=parameters(len(lemmas))), lemmas)
+                    for result in language_morpho:
+                        rows.setdefault(result[1], []).append(result)
             else:
-                lquery = f"lemma='{lemma}'"
-        if pos and pos in 'nvar':
-            pquery += f"pos='{pos}'"
-        if miscellanea:
-            mquery = f"miscellanea='{miscellanea}'"
-        query = ' AND '.join(filter(None, [lquery, pquery, mquery]))
-        if query: query = " WHERE " + query
+                language_index = db(self.language, "index")
+                if language_index:
+                    language_index.execute(sql('index_by_lemmas', self.language, parameters=parameters(len(lemmas))), lemmas)
+                    for result in language_index:
+                        rows.setdefault(result[0], result[1:])
+        except OperationalError:
+            raise
+        else:
+            identity_map = self.cache
+            lookups = {}
+            for lemma, pos in keys:
+                key = ('lemma', lemma, pos, None, None)
+                status, result = 'missing', None
+                if self.language == 'latin':
+                    candidates = [row for row in rows.get(lemma, []) if not (pos and pos in 'nvar') or row[2] == pos]
+                    if len(candidates) > 1:
+                        status, result = 'ambiguous', tuple(row[0] for row in candidates)
+                    elif candidates:
+                        status, result = 'found', Lemma._build(key, self.language, candidates[0][1], candidates[0][2], morpho=candidates[0])
+                elif lemma in rows and pos in ('*', 'n', 'v', 'a', 'r'):
+                    columns = rows[lemma]
+                    if pos == '*':
+                        resolved_pos = Lemma._index_pos(columns)
+                        if len(resolved_pos) > 1:
+                            status, result = 'ambiguous', tuple(resolved_pos)
+                        else:
+                            status, result = 'found', Lemma._build(key, self.language, lemma, resolved_pos)
+                    elif columns['nvar'.index(pos)]:
+                        status, result = 'found', Lemma._build(key, self.language, lemma, pos)
+                if status == 'missing':
+                    identity_map.put(key, None)
+                lookups[(lemma, pos)] = Lookup(lemma, pos, status, result)
+            return lookups
+
+    @lru_cache(maxsize=2048)
+    def get(self, lemma, pos='*', miscellanea=None, mode=None, limit: int=None, offset: int=0) -> List[Lemma]:
+        """
+        Returns the lemmas matching lemma, or with mode='startswith', 'endswith' or 'contains', those starting with,
+        ending with or containing it (ignoring case). Matches by mode come in alphabetical order (reversed
+        alphabetical for 'endswith'); limit and offset page through them.
+
+        Matches by mode probe the {language}_search and {language}_trigrams tables built when the lemma and morpho
+        tables are compiled (reindex(language, 'lemma', 'morpho') adds them to databases compiled earlier).
+        """
+        conditions, parameters, order = self._lemma_conditions(lemma, pos, miscellanea, mode, language=self.language)
 
         _list = []
         if self.language == 'latin':
             try:
                 language_morpho = db(self.language, "morpho")
                 if language_morpho:
-                    language_morpho.execute(f"SELECT lemma, pos, miscellanea, id FROM {self.language}_morpho{query};")
+                    if order:
+                        language_morpho.execute(sql('morpho_lemmas_by_search', self.language, where=where(conditions), order=order),
+                                                parameters + self._page(limit, offset))
+                    else:
+                        language_morpho.execute(sql('morpho_lemmas', self.language, where=where(conditions)), parameters)
                     results = language_morpho.fetchall()
                 else:
                     results = None
@@ -1604,7 +1758,11 @@ class WordNet(object):
                 language_lemma = db(self.language, "lemma")
 
                 if language_lemma:
-                    language_lemma.execute(f"SELECT lemma, pos FROM {self.language}_lemma{query};")
+                    if order:
+                        language_lemma.execute(sql('lemmas_by_search', self.language, where=where(conditions), order=order),
+                                               parameters + self._page(limit, offset))
+                    else:
+                        language_lemma.execute(sql('lemmas', self.language, where=where(conditions)), parameters)
                     results = language_lemma.fetchall()
                 else:
                     results = None
@@ -1612,44 +1770,26 @@ class WordNet(object):
                 raise
             else:
                 if results:
-                    for result in set(results):
+                    for result in dict.fromkeys(results):
                         lem = Lemma(result[0], pos=result[1], miscellanea=None, id=None, language=self.language)
                         if lem is not None:
                             _list.append(lem)
+        if not order and (limit is not None or offset):
+            _list = _list[offset:None if limit is None else offset + limit]
         return _list
 
     @lru_cache(maxsize=1048)
-    def get_raw(self, lemma: str=None, pos: str=None, morpho: str=None, mode=None) -> list:
+    def get_raw(self, lemma: str=None, pos: str=None, morpho: str=None, mode=None, limit: int=None, offset: int=0) -> list:
         try:
-            lquery = pquery = mquery = ''
-            if lemma:
-                lemma = lemma.replace(' ', '_')
-                if "''" in lemma:
-                    pass
-                elif "'" in lemma:
-                    lemma = lemma.replace("'", "''")
-                if mode:
-                    if mode == 'endswith':
-                        lquery = f"lemma LIKE '%{lemma}'"
-                    elif mode == 'startswith':
-                        lquery = f"lemma LIKE '{lemma}%'"
-                    else:
-                        lquery = f"lemma LIKE '%{lemma}%'"
-                else:
-                    lquery = f"lemma='{lemma}'"
-
-            if pos and pos in 'nvar':
-                pquery += f"pos='{pos}'"
-
-            if morpho:
-                mquery = f"'{morpho}'"
-
-            query = ' AND '.join(filter(None, [lquery, pquery, mquery]))
-            if query: query = "WHERE " + query
+            conditions, parameters, order = self._lemma_conditions(lemma, pos, morpho, mode, language=self.language)
 
             language_morpho = db(self.language, "morpho")
             if language_morpho:
-                language_morpho.execute(f"SELECT lemma, pos, miscellanea FROM {self.language}_morpho {query}")
+                if order:
+                    language_morpho.execute(sql('morpho_raw_by_search', self.language, where=where(conditions), order=order),
+                                            parameters + self._page(limit, offset))
+                else:
+                    language_morpho.execute(sql('morpho_raw', self.language, where=where(conditions)), parameters)
                 results = language_morpho.fetchall()
             else:
                 results = None
@@ -1657,118 +1797,323 @@ class WordNet(object):
             raise
         else:
             if results:
+                if not order and (limit is not None or offset):
+                    results = results[offset:None if limit is None else offset + limit]
                 yield from iter(results)
 
-    @property
-    def semfields(self) -> Generator['Semfield', None, Iterable['Semfield']]:
-        if not self._semfields:
-            self._semfields = []
-            try:
-                common_semfield_hierarchy = db("common", "semfield_hierarchy")
+    @staticmethod
+    def _page(limit: int=None, offset: int=0) -> tuple:
+        """ The LIMIT and OFFSET parameters of a page of matches (a negative LIMIT is no limit in SQLite) """
+        return (-1 if limit is None else limit, offset or 0)
 
-                if common_semfield_hierarchy:
-                    common_semfield_hierarchy.execute("SELECT code, english FROM semfield_hierarchy")
-                    results = common_semfield_hierarchy.fetchall()
+    @staticmethod
+    def _lemma_conditions(lemma: str=None, pos: str=None, miscellanea: str=None, mode=None, language: str=None) -> Tuple[tuple, tuple, str]:
+        """
+        Builds the '?' conditions and their parameters for a lookup by lemma, part of speech and morphology, and,
+        for a lookup by mode, the {language}_search column the matches are ordered by (None otherwise)
+        """
+        conditions = []
+        values = []
+        order = None
+        if lemma:
+            lemma = lemma.replace(' ', '_')
+            if mode:
+                folded = lemma.lower()
+                if mode == 'endswith':
+                    order = 'reversed'
+                    conditions.append("search.reversed >= ? AND search.reversed < ?")
+                    values += prefix_range(folded[::-1])
+                elif mode == 'startswith':
+                    order = 'folded'
+                    conditions.append("search.folded >= ? AND search.folded < ?")
+                    values += prefix_range(folded)
                 else:
-                    results = None
-            except OperationalError:
-                raise
+                    order = 'folded'
+                    needle = list(dict.fromkeys(folded[i:i + 3] for i in range(len(folded) - 2)))
+                    if needle:
+                        conditions.append(f"search.id IN (SELECT id FROM {language}_trigrams WHERE trigram IN ({parameters(len(needle))}) "
+                                          f"GROUP BY id HAVING COUNT(*) = ?) AND instr(search.folded, ?)")
+                        values += needle + [len(needle), folded]
+                    else:
+                        # one or two characters match too many lemmas for their trigrams to narrow the search down
+                        conditions.append("instr(search.folded, ?)")
+                        values.append(folded)
             else:
-                if results:
-                    for result in results:
-                        semfield = Semfield(code=result[0], english=result[1], language=self.language)
-                        self._semfields.append(semfield)
-                        yield semfield
+                conditions.append("lemma=?")
+                values.append(lemma)
+        if pos and pos in 'nvar':
+            conditions.append("pos=?")
+            values.append(pos)
+        if miscellanea:
+            conditions.append("miscellanea=?")
+            values.append(miscellanea)
+        return tuple(conditions), tuple(values), order
+
+    @property
+    def semfields(self) -> Generator['Semfield', None, Iterable['Semfield']]:
+        if not self._semfields:
+            semfield_hierarchy = hierarchy.get()
+            self._semfields = [
+                Semfield(code=code, english=semfield_hierarchy.english(code), language=self.language)
+                for code in semfield_hierarchy.codes
+            ]
         return iter(self._semfields)
 
     def get_semfield_by_code(self, code: str) -> List['Semfield']:
-        try:
-            common_semfield_hierarchy = db("common", "semfield_hierarchy")
+        english = hierarchy.get().english(code)
+        if english is None:
+            return None
+        return [Semfield(english, code=code, language=self.language)]
 
-            if common_semfield_hierarchy:
-                common_semfield_hierarchy.execute(f"SELECT english FROM semfield_hierarchy WHERE code='{code}'")
-                results = common_semfield_hierarchy.fetchall()
-            else:
-                results = None
+    def get_semfield_by_english(self, english: str) -> List['Semfield']:
+        english = english.replace(' ', '_')
+        codes = hierarchy.get().codes_of(english)
+        if not codes:
+            return None
+        return [Semfield(english=english, code=code, language=self.language) for code in codes]
+
+    def semfield_profile(self, lemmas: Iterable[Union[Lemma, str]], rollup_to: Optional[Union[str, int]] = 'normal') -> Dict[int, float]:
+        """
+        Returns the distribution of semfields over a batch of Lemmas or lemma strings (every part of speech of a
+        string), e.g. the tokens of a document. Each occurrence of a lemma weighs 1, shared evenly among its
+        synsets that have semfields and then among the semfields of each synset.
+
+        The semfield vector of each distinct lemma is worked out once per batch of unknown lemmas, with one
+        IN (...) query per chunk for the synsets and for their semfields, and kept in a bounded map of the
+        language (apart from its identity map), so profiling further documents only reads the vectors of lemmas
+        not seen before.
+
+        :param rollup_to: 'normal' to count every semfield as its normal semfield, a level of the hierarchy
+            (0 for the top-level semfields) to count it as the semfield above it at that level, or None to
+            keep every semfield as it is.
+        :return: The weight of every semfield of the hierarchy, keyed by code, in the order of the hierarchy.
+        """
+        semfield_hierarchy = hierarchy.get()
+        if rollup_to == 'normal':
+            def rollup(code):
+                return semfield_hierarchy.normal(code) or code
+        elif rollup_to is None:
+            def rollup(code):
+                return code
+        elif isinstance(rollup_to, int) and not isinstance(rollup_to, bool):
+            def rollup(code):
+                return semfield_hierarchy.at_level(code, rollup_to)
+        else:
+            raise ValueError(f"cannot roll semfields up to {rollup_to!r}; use 'normal', a level or None")
+
+        counts = Counter((item.replace(' ', '_'), None) if isinstance(item, str) else (item.lemma, item.pos) for item in lemmas)
+        vectors = self._semfield_vectors(counts)
+        profile = dict.fromkeys(semfield_hierarchy.codes, 0.0)
+        for key, count in counts.items():
+            for code, weight in vectors[key].items():
+                code = rollup(code)
+                profile[code] = profile.get(code, 0.0) + count * weight
+        return profile
+
+    def _semfield_vectors(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[int, float]]:
+        """ The semfield vector ({code: weight}, summing to 1 or empty) of each (lemma, pos or None), from the
+        semfield_vectors map of the language or, for the lemmas not in it, from one batch of queries """
+        semfield_vectors = cache.get(self.language, 'semfield_vectors')
+        vectors = {}
+        for key in keys:
+            vector = semfield_vectors.get(key)
+            if vector is not cache.MISSING:
+                vectors[key] = vector
+        pending = [key for key in keys if key not in vectors]
+        if not pending:
+            return vectors
+
+        senses = {}  # lemma -> [(pos, synset)]
+        codes = {}  # synset -> its semfield codes
+        try:
+            language_index = db(self.language, "index")
+
+            if language_index:
+                for chunk in chunks(dict.fromkeys(lemma for lemma, _ in pending)):
+                    language_index.execute(sql('membership_by_lemmas', self.language, parameters=parameters(len(chunk))), chunk)
+                    for lemma, pos, synset, rank in language_index:
+                        senses.setdefault(lemma, []).append((pos, synset))
+
+            synsets = list(dict.fromkeys(synset for entries in senses.values() for _, synset in entries))
+            for semfield_language in dict.fromkeys(('common', self.language)):
+                language_semfield = db(semfield_language, "semfield")
+                unlabelled = [synset for synset in synsets if synset not in codes]
+                if language_semfield and unlabelled:
+                    for chunk in chunks(unlabelled):
+                        language_semfield.execute(sql('semfield_codes_by_synsets', semfield_language, parameters=parameters(len(chunk))), chunk)
+                        for synset, code in language_semfield:
+                            codes.setdefault(synset, []).append(code)
         except OperationalError:
             raise
         else:
-            if results:
-                return [
-                    Semfield(result[0], code=code, language=self.language)
-                    for result in results
-                ]
+            for lemma, pos in pending:
+                labelled = [synset for entry_pos, synset in senses.get(lemma, []) if (pos is None or entry_pos == pos) and synset in codes]
+                vector = {}
+                for synset in labelled:
+                    for code in codes[synset]:
+                        vector[code] = vector.get(code, 0.0) + 1 / len(labelled) / len(codes[synset])
+                vectors[(lemma, pos)] = semfield_vectors.put((lemma, pos), vector)
+            return vectors
 
-            else:
-                return None
+    def get_semfield(self, code: str, english: str) -> Semfield:
+        return Semfield(code=code, english=english, language=self.language)
 
-    def get_semfield_by_english(self, english: str) -> List['Semfield']:
+    @property
+    def lemmas(self) -> Generator[object, None, Iterable[object]]:
+        """ Streams the lemmas of the WordNet, built from the morpho or index rows as they are read """
+        if self._lemmas is not None:
+            yield from iter(self._lemmas)
+            return
+        temp = [] if self._retain else None
         try:
-            english = english.replace(' ', '_')
-            common_semfield_hierarchy = db("common", "semfield_hierarchy")
+            language_morpho = db(self.language, "morpho")
 
-            if common_semfield_hierarchy:
-                common_semfield_hierarchy.execute(f"SELECT code FROM semfield_hierarchy WHERE english='{english}'")
-                results = common_semfield_hierarchy.fetchall()
+            if language_morpho:
+                language_morpho.execute(sql('morpho', self.language, where=''))
             else:
-                results = None
+                language_index = db(self.language, "index")
+
+                if language_index:
+                    language_index.execute(sql('index', self.language))
         except OperationalError:
             raise
         else:
-            if results:
-                return [
-                    Semfield(
-                        english=english, code=result[0], language=self.language
-                    )
-                    for result in results
-                ]
-
+            if language_morpho:
+                lemmas = (self._lemma_from_morpho(result) for result in language_morpho)
+            elif language_index:
+                lemmas = (
+                    Lemma._build(('lemma', result[0], pos, None, None), self.language, result[0], pos)
+                    for result in language_index
+                    for pos, synsets in zip('nvar', result[1:5]) if synsets
+                )
             else:
-                return None
+                lemmas = ()
+            for lemma in lemmas:
+                if temp is not None:
+                    temp.append(lemma)
+                yield lemma
+            if temp is not None:
+                self._lemmas = temp
+
+    def _lemma_from_morpho(self, result: tuple) -> Lemma:
+        """ The lemma of a {language}_morpho row """
+        if self.language == 'latin':
+            return Lemma._build(('lemma', result[1], result[2], result[7], result[0]), self.language, result[1], result[2], morpho=result)
+        else:
+            # only Latin lemmas are defined by their morpho row; the others are still checked against the index
+            return Lemma(lemma=result[1], pos=result[2], miscellanea=result[-1], id=result[0], language=self.language)
 
-    def get_semfield(self, code: str, english: str) -> Semfield:
-        return Semfield(code=code, english=english, language=self.language)
+    def filter_morpho(self, **features) -> Generator[Lemma, None, None]:
+        """
+        Streams the lemmas whose morphology has all the given features, e.g. filter_morpho(pos='n', group='3',
+        gender='f') for the 3rd-declension feminine nouns or filter_morpho(pos='v', group='1', voice='d') for the
+        deponent 1st-conjugation verbs. A feature is given as the characters it may be (as pos='nvar' elsewhere);
+        the features are those of MorphoTag, with pos read from the morpho row.
 
-    @property
-    def lemmas(self) -> Generator[object, None, Iterable[object]]:
-        if self._lemmas is None:
-            self._lemmas = []
-            try:
-                language_morpho = db(self.language, "morpho")
+        The lookup runs on {language}_features, the tags decoded into indexed columns when the morpho table is
+        compiled (reindex(language, 'morpho') adds it to a database compiled earlier).
+        """
+        unknown = set(features) - set(MorphoTag.__slots__)
+        if unknown:
+            raise ValueError(f"unknown morphological features: {', '.join(sorted(unknown))}")
+
+        conditions = []
+        values = []
+        for feature, accepted in features.items():
+            if accepted is not None:
+                accepted = list(dict.fromkeys(accepted))
+                conditions.append(f'features."{feature}" IN ({parameters(len(accepted))})')
+                values += accepted
+        try:
+            language_morpho = db(self.language, "morpho")
 
-                if language_morpho:
-                    language_morpho.execute(f"SELECT lemma, pos, miscellanea, id FROM {self.language}_morpho")
-                    results = language_morpho.fetchall()
+            if language_morpho:
+                language_morpho.execute(sql('morpho_by_features', self.language, where=where(conditions)), values)
+        except OperationalError:
+            raise
+        else:
+            if language_morpho:
+                for result in language_morpho:
+                    lemma = self._lemma_from_morpho(result)
+                    if lemma is not None:
+                        yield lemma
+
+    def paradigms(self, lemmas: Iterable[Union[Lemma, str]] = None, chunk_size: int = CHUNK_SIZE) -> Generator[Paradigm, None, None]:
+        """
+        Streams the Paradigm of each morpho row, for the whole lexicon (by default) or for the given Lemmas or
+        lemma strings (every part of speech of a string), in order, with one IN (...) query per chunk. The rows
+        are read from a single cursor and the endings of each paradigm class are worked out once, so exporting
+        every form of the lexicon is one pass, e.g.
+        for lemma, forms in LWN.paradigms(): writer.writerows((form, lemma.lemma, tag) for form, tag in forms)
+        """
+        try:
+            language_morpho = db(self.language, "morpho")
+
+            if language_morpho and lemmas is None:
+                language_morpho.execute(sql('morpho', self.language, where=''))
+        except OperationalError:
+            raise
+        else:
+            if not language_morpho:
+                return
+            if lemmas is None:
+                for result in language_morpho:
+                    lemma = self._lemma_from_morpho(result)
+                    if lemma is not None:
+                        yield Paradigm(lemma, Morpho(result, self.language).paradigm())
+                return
+
+            lemmas = iter(lemmas)
+            while True:
+                window = [(item, None) if isinstance(item, str) else (item.lemma, item.pos) for item in islice(lemmas, chunk_size)]
+                if not window:
+                    return
+                names = list(dict.fromkeys(lemma.replace(' ', '_') for lemma, _ in window))
+                rows = {}
+                try:
+                    language_morpho.execute(sql('morpho_by_lemmas', self.language, parameters=parameters(len(names))), names)
+                except OperationalError:
+                    raise
                 else:
-                    language_index = db(self.language, "index")
+                    for result in language_morpho.fetchall():
+                        rows.setdefault(result[1], []).append(result)
+                for lemma, pos in window:
+                    for result in rows.get(lemma.replace(' ', '_'), []):
+                        if pos is None or result[2] == pos:
+                            instance = self._lemma_from_morpho(result)
+                            if instance is not None:
+                                yield Paradigm(instance, Morpho(result, self.language).paradigm())
+
+    def analyze(self, form: str) -> List[Analysis]:
+        """
+        Returns every reading of an inflected form, e.g. analyze('regis') gives rex (genitive singular) and rego
+        (2nd person singular present active indicative). Forms are matched ignoring case; a form with no reading
+        is tried again without an enclitic (-que, -ne, -ve).
 
-                    if language_index:
-                        language_index.execute(f"SELECT * FROM {self.language}_index")
-                        results = language_index.fetchall()
-                    else:
-                        results = None
-            except OperationalError:
-                raise
-            else:
-                if results:
-                    if language_morpho:
-                        for result in results:
-                            lemma, pos, miscellanea, id = result
-                            lemma = Lemma(lemma=lemma, pos=pos, miscellanea=miscellanea, id=id, language=self.language)
-                            self._lemmas.append(lemma)
-                            yield lemma
-                    else:
-                        pos = ['*', 'n', 'v', 'a', 'r']
-                        for result in results:
-                            for i in range(1, 5):
-                                if result[i]:
-                                    lemma = Lemma(result[0], pos=pos[i], miscellanea=None, id=None,
-                                                  language=self.language)
-                                    self._lemmas.append(lemma)
-                                    yield lemma
+        Forms are generated from the Latin morphology into {language}_forms when the morpho table is compiled
+        (reindex(language, 'morpho') adds it to a database compiled earlier), so a form is a single index probe.
+        """
+        try:
+            language_morpho = db(self.language, "morpho")
 
+            if language_morpho:
+                language_morpho.execute(sql('forms_by_form', self.language), (form,))
+                results = language_morpho.fetchall()
+                for enclitic in ENCLITICS:
+                    if results or not form.endswith(enclitic) or len(form) == len(enclitic):
+                        break
+                    language_morpho.execute(sql('forms_by_form', self.language), (form[:-len(enclitic)],))
+                    results = language_morpho.fetchall()
+        except OperationalError:
+            raise
         else:
-            yield from iter(self._lemmas)
+            analyses = []
+            if language_morpho:
+                for result in results:
+                    lemma = self._lemma_from_morpho(result[2:])
+                    if lemma is not None:
+                        analyses.append(Analysis(result[0], lemma, result[1], decode(result[1])))
+            return analyses
 
     def __iter__(self):
         yield from self.lemmas
@@ -1778,63 +2123,65 @@ class WordNet(object):
 
     @property
     def relations(self) -> Generator['Relation', None, Iterable['Relation']]:
-        if not self._relations:
-            self._relations = []
-            try:
-                common_relation = db("common", "relation")
-                if common_relation:
-                    common_relation.execute("SELECT * FROM common_relation")
-                    results = common_relation.fetchall()
-                else:
-                    results = None
-            except OperationalError:
-                raise
-            else:
-                if results:
-                    for result in results:
-                        self._relations.append(Relation(*result, language='common'))
+        """ Streams the common relations and the relations of the WordNet's language, as they are read """
+        if self._relations is not None:
+            yield from self._relations
+            return
+        temp = [] if self._retain else None
+        for relation_language in ('common', self.language):
             try:
-                language_relation = db(self.language, "relation")
+                language_relation = db(relation_language, "relation")
                 if language_relation:
-                    language_relation.execute(f"SELECT * FROM {self.language}_relation")
-                    results = language_relation.fetchall()
+                    language_relation.execute(sql('relations', relation_language, where=''))
             except OperationalError:
                 raise
             else:
-                if results:
-                    for result in results:
-                        self._relations.append(Relation(*result, language=self.language))
-        yield from self._relations
+                if language_relation:
+                    for result in language_relation:
+                        relation = Relation(*result, language=relation_language)
+                        if temp is not None:
+                            temp.append(relation)
+                        yield relation
+        if temp is not None:
+            self._relations = temp
 
     def get_relations(self, *, source: Synset=None, target: Synset=None, w_source: Lemma=None, w_target: Lemma=None, type=None, lexical=False) -> Generator['Relation', None, Iterable['Relation']]:
-        W_SOURCE = W_TARGET = SOURCE = TARGET = TYPE = SYNSETS = ''
+        conditions = []
+        parameters = []
         if lexical or type in ['\\', '/', '+c' '-c']:
             if not (w_source and w_target):
                 raise ValueError("a source and target lemma must be specified for lexical relations")
-            W_SOURCE = f"w_source='{w_source.lemma}'"
-            W_TARGET = f"w_target='{w_target.lemma}'"
+            conditions += ["w_source=?", "w_target=?"]
+            parameters += [w_source.lemma, w_target.lemma]
         else:
-            if source and target:
-                SOURCE = f"id_source='{source.id}'"
-                TARGET = f"id_target='{target.id}'"
+            if source or target:
+                if source:
+                    conditions.append("id_source=?")
+                    parameters.append(source.id)
+                if target:
+                    conditions.append("id_target=?")
+                    parameters.append(target.id)
             else:
                 if w_source:
                     SYNSETS = [synset.id for synset in w_source.synsets]
-                    SOURCE = f"id_source IN ({','.join(['?' for synset in w_source.synsets])})"
+                    conditions.append(f"id_source IN ({','.join(['?' for synset in SYNSETS])})")
+                    parameters += SYNSETS
                 elif w_target:
                     SYNSETS = [synset.id for synset in w_target.synsets]
-                    SOURCE = f"id_target IN ({','.join(['?' for synset in w_target.synsets])})"
+                    conditions.append(f"id_target IN ({','.join(['?' for synset in SYNSETS])})")
+                    parameters += SYNSETS
 
         if type:
-            TYPE = f"type='{type}'"
-        QR = ' AND '.join(filter(lambda x: x != '', [SOURCE, TARGET, W_SOURCE, W_TARGET, TYPE]))
+            conditions.append("type=?")
+            parameters.append(type)
+        QR = where(conditions)
 
         temp = []
         if not lexical:
             try:
                 common_relation = db("common", "relation")
                 if common_relation:
-                    common_relation.execute("SELECT * FROM common_relation WHERE " + QR, SYNSETS)
+                    common_relation.execute(sql('relations', 'common', where=QR), parameters)
                     results = common_relation.fetchall()
                 else:
                     results = None
@@ -1848,7 +2195,7 @@ class WordNet(object):
             language_relation = db(self.language, "relation")
 
             if language_relation:
-                language_relation.execute(f"SELECT * FROM {self.language}_relation WHERE " + QR, SYNSETS)
+                language_relation.execute(sql('relations', self.language, where=QR), parameters)
                 results = language_relation.fetchall()
             else:
                 results = None
@@ -1862,21 +2209,216 @@ class WordNet(object):
                     temp.append(relation)
         yield from temp
 
+    def lowest_common_hypernyms(self, pairs: Iterable[Tuple[Synset, Synset]]) -> List[List[Synset]]:
+        """
+        Returns the lowest common hypernyms of each pair of synsets: the deepest (by max depth) of the hypernyms
+        both share, counting each synset as its own hypernym, in order of id.
+
+        Each synset's ancestor label (its rank and the ranks of all its hypernyms, deepest first) is read from
+        {language}_ancestry, built when the relation table is compiled (reindex(language, 'relation') adds it to
+        a database compiled earlier), with one IN (...) query per chunk of synsets; a pair then costs a merge of
+        two short sorted labels.
+        """
+        pairs = [(a.id, b.id) for a, b in pairs]
+        labels = {}  # synset id -> its ancestor label
+        ranked = {}  # rank -> (synset id, max depth)
+        commons = {}  # pair -> the ranks its synsets have in common, deepest first
+        try:
+            relation_language = _relation_language(self.language)
+            language_relation = db(relation_language, "relation") if relation_language else None
+
+            if language_relation:
+                for chunk in chunks(dict.fromkeys(id for pair in pairs for id in pair)):
+                    language_relation.execute(sql('ancestry_by_synsets', relation_language, parameters=parameters(len(chunk))), chunk)
+                    for synset, rank, depth, ancestors in language_relation:
+                        labels[synset] = ancestors
+                        ranked[rank] = (synset, depth)
+                for a, b in dict.fromkeys(pairs):
+                    if a in labels and b in labels:
+                        commons[(a, b)] = graph.lowest_common_ranks(labels[a], labels[b])
+                unread = {rank for common in commons.values() for rank in common if rank not in ranked}
+                for chunk in chunks(unread):
+                    language_relation.execute(sql('ancestry_by_ranks', relation_language, parameters=parameters(len(chunk))), chunk)
+                    for synset, rank, depth in language_relation:
+                        ranked[rank] = (synset, depth)
+        except OperationalError:
+            raise
+        else:
+            results = []
+            for a, b in pairs:
+                common = commons.get((a, b))
+                if common:
+                    deepest = ranked[common[0]][1]
+                    ids = sorted(ranked[rank][0] for rank in common if ranked[rank][1] == deepest)
+                else:
+                    ids = [a] if a == b else []
+                results.append([Synset._build(id, self.language) for id in ids])
+            return results
+
+    def translate(self, lemmas: Iterable[Union[Lemma, str]], target_languages: Iterable[str] = ('english',)) -> List[Dict[str, List[Translation]]]:
+        """
+        Translates a batch of Lemmas or lemma strings (every part of speech of a string) through the synset ids the
+        languages share. The synsets of the whole batch are read from {language}_membership with one IN (...)
+        query per chunk, and their lemmas in each target language likewise, from the target's membership table
+        (or, for a language without an index, the word column of its synset table), so a glossary costs a few
+        queries per language rather than a few per lemma and synset.
+
+        :return: One dict per lemma, in order, mapping each target language to its candidate Translations, ranked
+            by the number of synsets shared, then by the sense rank of the best of them, then alphabetically.
+        """
+        window = [(item, None) if isinstance(item, str) else (item.lemma, item.pos) for item in lemmas]
+        target_languages = list(target_languages)
+        senses = {}  # lemma -> [(pos, synset, rank)]
+        members = {language: {} for language in target_languages}  # language -> synset id -> its lemmas
+        try:
+            language_index = db(self.language, "index")
+
+            if language_index:
+                names = dict.fromkeys(lemma.replace(' ', '_') for lemma, _ in window)
+                for chunk in chunks(names):
+                    language_index.execute(sql('membership_by_lemmas', self.language, parameters=parameters(len(chunk))), chunk)
+                    for lemma, pos, synset, rank in language_index:
+                        senses.setdefault(lemma, []).append((pos, synset, rank))
+
+            synsets = list(dict.fromkeys(synset for entries in senses.values() for _, synset, _ in entries))
+            for language in target_languages:
+                target_index = db(language, "index")
+                if target_index:
+                    for chunk in chunks(synsets):
+                        target_index.execute(sql('membership_lemmas_by_synsets', language, parameters=parameters(len(chunk))), chunk)
+                        for synset, lemma in target_index:
+                            members[language].setdefault(synset, []).append(lemma)
+                    continue
+                target_synset = db(language, "synset")
+                if target_synset:
+                    for chunk in chunks(synsets):
+                        target_synset.execute(sql('synset_words_by_ids', language, parameters=parameters(len(chunk))), chunk)
+                        for synset, word in target_synset:
+                            if word and word != ' GAP! ':
+                                members[language][synset] = [lemma.lower() for lemma in word.strip().split(' ')]
+        except OperationalError:
+            raise
+        else:
+            results = []
+            for lemma, pos in window:
+                entries = [entry for entry in senses.get(lemma.replace(' ', '_'), []) if pos is None or entry[0] == pos]
+                translations = {}
+                for language in target_languages:
+                    candidates = {}  # (lemma, pos) -> [(rank, synset)]
+                    for entry_pos, synset, rank in entries:
+                        for member in members[language].get(synset, []):
+                            if member != 'gap!':
+                                candidates.setdefault((member, entry_pos), []).append((rank, synset))
+                    ranked = sorted(candidates.items(), key=lambda item: (-len(item[1]), min(item[1])[0], item[0]))
+                    translations[language] = [
+                        Translation(member, member_pos, language, tuple(synset for _, synset in sorted(shared)))
+                        for (member, member_pos), shared in ranked
+                    ]
+                results.append(translations)
+            return results
+
+    def ancestors(self, synset: Synset, type: str = '@', depth: int = -1) -> List[Synset]:
+        """
+        Returns every synset reachable from synset under the relation type (by default its hypernyms, theirs, and
+        so on), nearest first; depth bounds the number of steps (-1 for no bound).
+
+        With a database compiled with closure=True ({language}_closure, see compile()) this is one index range
+        scan; otherwise the relation graph of the language is loaded on first use and walked.
+        """
+        return self._closure(synset, type, depth, reverse=False)
+
+    def descendants(self, synset: Synset, type: str = '@', depth: int = -1) -> List[Synset]:
+        """
+        Returns every synset from which synset is reachable under the relation type (by default its hyponyms by
+        way of hypernymy), nearest first; depth bounds the number of steps (-1 for no bound). See ancestors().
+        """
+        return self._closure(synset, type, depth, reverse=True)
+
+    def _closure(self, synset: Synset, type: str, depth: int, reverse: bool) -> List[Synset]:
+        ids = None
+        try:
+            relation_language = _relation_language(self.language)
+            language_relation = db(relation_language, "relation") if relation_language else None
+
+            if language_relation:
+                language_relation.execute(sql('table_exists'), (f"{relation_language}_closure",))
+                if language_relation.fetchone():
+                    statement = sql('closure_sources' if reverse else 'closure_targets', relation_language,
+                                    depth=' AND distance<=?' if depth >= 0 else '')
+                    language_relation.execute(statement, (synset.id, type) + ((depth,) if depth >= 0 else ()))
+                    ids = [id for id, distance in language_relation]
+        except OperationalError:
+            raise
+        else:
+            if ids is None:
+                relation_graph = self.graph
+                if relation_graph is None:
+                    relation_graph = self.load_graph()
+                node = relation_graph.node(synset.id)
+                distances = relation_graph.distances(node, type, reverse) if node is not None else {}
+                ids = [relation_graph.id(other) for other, distance in
+                       sorted(distances.items(), key=lambda item: (item[1], relation_graph.id(item[0])))
+                       if 0 < distance and (depth < 0 or distance <= depth)]
+            return [related for related in self.get_synsets_by_ids(ids) if related is not None]
+
+    def similarity_matrix(self, synsets_a: Iterable[Synset], synsets_b: Iterable[Synset] = None, metric: str = 'path') -> List[List[float]]:
+        """
+        Scores every synset of synsets_a against every synset of synsets_b (by default synsets_a itself) with a
+        metric of Synset ('path', 'lch' or 'wup'), on the relation graph of the language (loaded on first use).
+        Every synset is resolved to its node and its hypernyms (with their distances) once, and the depths once,
+        so a pair costs one pass over the smaller of two hypernym dicts (see RelationGraph.similarity_rows()).
+
+        :return: One row per synset of synsets_a, one score per synset of synsets_b, None where the pair shares
+            no hypernym (or, for lch, differs in part of speech).
+        """
+        if metric not in graph.METRICS:
+            raise ValueError(f"unknown similarity metric '{metric}'; use one of {', '.join(graph.METRICS)}")
+        relation_graph = self.graph
+        if relation_graph is None:
+            relation_graph = self.load_graph()
+        ids_a = [synset.id for synset in synsets_a]
+        ids_b = ids_a if synsets_b is None else [synset.id for synset in synsets_b]
+        rows = relation_graph.similarity_rows(ids_a, ids_b, metric)
+        if metric == 'lch':
+            for id_a, row in zip(ids_a, rows):
+                row[:] = [None if id_a[0] != id_b[0] else score for id_b, score in zip(ids_b, row)]
+        return rows
+
     def __repr__(self):
         return f"WordNet('{self.language}')"
 
     @lru_cache()
-    def max_depth_for(self, pos: str):
+    def max_depth_for(self, pos: str) -> int:
         """
         Compute the max depth for the given part of speech.  This is
         used by the lch similarity metric.
         """
-        depth = 0
-        for ii in self.get_synsets(pos):
-            depth = max(depth, ii.max_depth())
-        return depth
+        relation_graph = graph.loaded(self.language)
+        if relation_graph is not None:
+            return relation_graph.max_depth_for(pos)
+
+        try:
+            relation_language = _relation_language(self.language)
+            language_relation = db(relation_language, "relation") if relation_language else None
+
+            if language_relation:
+                language_relation.execute(sql('max_depth_by_pos', relation_language), (pos,))
+                result = language_relation.fetchone()
+            else:
+                result = None
+        except OperationalError:
+            raise
+        else:
+            return (result[0] or 0) if result else 0
 
 # Helper functions
+def _relation_language(language: str) -> str:
+    """ The language whose relation database holds the derived hierarchy tables (ancestry, depth) of a language:
+    its own if compiled, else the common one; None if neither is """
+    return next((relation_language for relation_language in dict.fromkeys((language, 'common'))
+                 if db(relation_language, "relation")), None)
+
+
 def breadth_first(tree, children=iter, maxdepth=-1):
     """Traverse the nodes of a tree in breadth-first order.
     (No need to check for cycles.)